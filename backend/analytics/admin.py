@@ -1,3 +1,34 @@
 from django.contrib import admin
+from .models import HourlyTotals, DailyResourceDownloads, DailySearchQueries, RollupState, SketchSnapshot, SearchTiming
 
-# Register your models here.
+@admin.register(HourlyTotals)
+class HourlyTotalsAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'downloads', 'searches']
+    list_filter = ['hour']
+
+@admin.register(DailyResourceDownloads)
+class DailyResourceDownloadsAdmin(admin.ModelAdmin):
+    list_display = ['day', 'resource', 'count']
+    list_filter = ['day']
+
+@admin.register(DailySearchQueries)
+class DailySearchQueriesAdmin(admin.ModelAdmin):
+    list_display = ['day', 'query', 'count']
+    list_filter = ['day']
+    search_fields = ['query']
+
+@admin.register(RollupState)
+class RollupStateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_id', 'updated_at']
+
+@admin.register(SketchSnapshot)
+class SketchSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['name', 'day', 'worker', 'updated_at']
+    list_filter = ['name', 'day']
+    exclude = ['counts']
+
+@admin.register(SearchTiming)
+class SearchTimingAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'source', 'latency_ms', 'hits', 'timed_out', 'error', 'cache_hit']
+    list_filter = ['source', 'timed_out', 'error', 'cache_hit']
+    search_fields = ['search_id']
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import Counter
+from django.core.cache import cache
+from backend.metrics import record_cache
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from datetime import timedelta
+from resources.caching import get_version
+from resources.models import Resource, SearchLog, DownloadLog
+from .models import HourlyTotals, DailyResourceDownloads, DailySearchQueries, RollupState
+from .rollups import roll_up, high_water_marks
+from . import sketches
+
+# Windows (days) kept warm by the rollup job; other ``days`` values are cached on first request
+WARM_WINDOWS = (7, 30, 90, 365)
+# A cached payload is rebuilt in the background once the rollups move on or it gets this old (seconds)
+DASHBOARD_MAX_AGE = 60
+# The dashboard folds pending raw rows itself when the rollup job has not run for this long
+STALE_ROLLUP = timedelta(seconds=60)
+
+
+def refresh_rollups():
+    latest = RollupState.objects.order_by('updated_at').values_list('updated_at', flat=True).first()
+    if latest is None or timezone.now() - latest > STALE_ROLLUP:
+        try:
+            roll_up()
+        except Exception as e:
+            print(f"⚠️ Analytics rollup failed: {e}")
+
+
+def heavy_hitters(name, start_day, rollups, field, n=10):
+    """Top ``n`` (key, count) since ``start_day``: sketches for the days they cover, rollups for the rest.
+
+    Sketches start (and are pruned) part-way through a day, so their first
+    day is counted from the rollups too; a window entirely after it is
+    answered from the sketches alone.
+    """
+    first = sketches.first_day(name)
+    merged = Counter()
+    if first is not None:
+        merged.update(dict(sketches.top(name, max(start_day, first + timedelta(days=1)), sketches.TOP_K)))
+    if first is None or first >= start_day:
+        older = rollups.filter(day__gte=start_day)
+        if first is not None:
+            older = older.filter(day__lte=first)
+        merged.update({
+            str(key): count
+            for key, count in older.values_list(field).annotate(count=Sum('count')).order_by('-count')[:sketches.TOP_K]
+        })
+    return merged.most_common(n)
+
+
+def build_dashboard(days):
+    start_day = (timezone.localtime() - timedelta(days=days)).date()
+    downloads = DailyResourceDownloads.objects.filter(day__gte=start_day)
+
+    # Downloads per month
+    downloads_data = [
+        {'month': row['month'].strftime('%Y-%m'), 'count': row['count']}
+        for row in downloads.annotate(month=TruncMonth('day')).values('month').annotate(
+            count=Sum('count')
+        ).order_by('month')
+    ]
+
+    # Top searched keywords
+    search_data = [
+        {'query': query, 'count': count}
+        for query, count in heavy_hitters('queries', start_day, DailySearchQueries.objects, 'query')
+    ]
+
+    # Resource source distribution
+    source_data = Resource.objects.values('source').annotate(count=Count('id'))
+
+    # Most accessed materials
+    top_downloads = heavy_hitters('resources', start_day, DailyResourceDownloads.objects, 'resource_id')
+    titles = Resource.objects.only('title').in_bulk([int(resource_id) for resource_id, _ in top_downloads])
+    popular_resources = [
+        {'title': titles[int(resource_id)].title, 'download_count': count}
+        for resource_id, count in top_downloads
+        if int(resource_id) in titles
+    ]
+
+    # User activity timeline
+    activity_data = [
+        {'date': row['day'].isoformat(), 'count': row['count']}
+        for row in downloads.values('day').annotate(count=Sum('count')).order_by('day')
+    ]
+
+    # Rolled-up totals plus the few raw rows past the high-water marks
+    marks = high_water_marks()
+    totals = HourlyTotals.objects.aggregate(downloads=Sum('downloads'), searches=Sum('searches'))
+
+    return {
+        'downloads_per_month': downloads_data,
+        'top_searches': list(search_data),
+        'source_distribution': list(source_data),
+        'popular_resources': list(popular_resources),
+        'user_activity': activity_data,
+        'total_resources': Resource.objects.count(),
+        'total_downloads': (totals['downloads'] or 0) + DownloadLog.objects.filter(id__gt=marks.get('downloads', 0)).count(),
+        'total_searches': (totals['searches'] or 0) + SearchLog.objects.filter(id__gt=marks.get('searches', 0)).count(),
+    }
+
+
+def _cache_key(days):
+    return f'analytics-dashboard:{days}'
+
+
+def rebuild_dashboard(days):
+    """Compute the ``days`` payload and cache it with the rollup version it reflects"""
+    version = get_version('analytics')
+    payload = build_dashboard(days)
+    cache.set(_cache_key(days), {'version': version, 'built_at': time.time(), 'payload': payload}, timeout=None)
+    return payload
+
+
+def _rebuild_in_background(days):
+    try:
+        refresh_rollups()
+        rebuild_dashboard(days)
+    except Exception as e:
+        print(f"⚠️ Dashboard rebuild failed: {e}")
+    finally:
+        connection.close()
+        cache.delete(_cache_key(days) + ':rebuilding')
+
+
+def pending_payload():
+    """Empty dashboard returned while the first build of a window runs in the background"""
+    return {
+        'pending': True,
+        'downloads_per_month': [],
+        'top_searches': [],
+        'source_distribution': [],
+        'popular_resources': [],
+        'user_activity': [],
+        'total_resources': 0,
+        'total_downloads': 0,
+        'total_searches': 0,
+    }
+
+
+def dashboard_payload(days):
+    """Cached dashboard for ``days``, served stale while one worker rebuilds it.
+
+    Nothing is computed on the request path: rollup_analytics keeps the
+    common windows warm, and any other miss or stale entry starts a
+    background rebuild (one per window across workers). A window that has
+    never been built answers with pending_payload() until that finishes.
+    """
+    entry = cache.get(_cache_key(days))
+    record_cache('dashboard', entry is not None)
+
+    stale = entry is None or (
+        entry['version'] != get_version('analytics') or time.time() - entry['built_at'] > DASHBOARD_MAX_AGE
+    )
+    # cache.add is the cross-worker lock: one rebuild per window at a time
+    if stale and cache.add(_cache_key(days) + ':rebuilding', 1, timeout=300):
+        threading.Thread(
+            target=_rebuild_in_background, args=(days,), daemon=True, name='dashboard-rebuild'
+        ).start()
+    return entry['payload'] if entry else pending_payload()
+
+
+def warm_dashboards(windows=WARM_WINDOWS):
+    """Rebuild the common windows whose cached payload is missing or stale"""
+    version = get_version('analytics')
+    for days in windows:
+        entry = cache.get(_cache_key(days))
+        if entry is None or entry['version'] != version or time.time() - entry['built_at'] > DASHBOARD_MAX_AGE:
+            rebuild_dashboard(days)
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time as day_time
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from resources.models import SearchLog, DownloadLog
+
+# Rows fetched per database round trip, and bytes buffered before a chunk is handed out
+CHUNK_ROWS = 2000
+CHUNK_BYTES = 64 * 1024
+
+# Exported columns of each log: (output name, values_list lookup)
+EXPORTS = {
+    'searches': (SearchLog, [
+        ('id', 'id'), ('timestamp', 'timestamp'), ('user_id', 'user_id'), ('username', 'user__username'),
+        ('query', 'query'), ('results_count', 'results_count'),
+    ]),
+    'downloads': (DownloadLog, [
+        ('id', 'id'), ('timestamp', 'timestamp'), ('user_id', 'user_id'), ('username', 'user__username'),
+        ('resource_id', 'resource_id'), ('resource_title', 'resource__title'),
+    ]),
+}
+FORMATS = ('csv', 'jsonl')
+
+
+def parse_moment(value, end=False):
+    """ISO datetime, or a date meaning its start (or, with ``end``, the start of the next day)"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        if end:
+            day = day.fromordinal(day.toordinal() + 1)
+        moment = datetime.combine(day, day_time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(kind, start=None, end=None, user=None):
+    """Column names and a server-side iterator over the ``kind`` log rows, oldest first"""
+    model, columns = EXPORTS[kind]
+    rows = model.objects.all()
+    if start:
+        rows = rows.filter(timestamp__gte=parse_moment(start))
+    if end:
+        rows = rows.filter(timestamp__lt=parse_moment(end, end=True))
+    if user:
+        rows = rows.filter(user_id=int(user)) if str(user).isdigit() else rows.filter(user__username=user)
+
+    rows = rows.order_by('timestamp', 'id').values_list(*[lookup for _, lookup in columns])
+    return [name for name, _ in columns], rows.iterator(chunk_size=CHUNK_ROWS)
+
+
+def _batched(lines):
+    """Join small encoded lines into chunks of about CHUNK_BYTES"""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def csv_lines(names, rows):
+    line = io.StringIO()
+    writer = csv.writer(line)
+    writer.writerow(names)
+    yield line.getvalue().encode()
+    for row in rows:
+        line.seek(0)
+        line.truncate()
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        yield line.getvalue().encode()
+
+
+def jsonl_lines(names, rows):
+    for row in rows:
+        record = dict(zip(names, row))
+        record['timestamp'] = record['timestamp'].isoformat()
+        yield json.dumps(record, ensure_ascii=False).encode() + b'\n'
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(kind, fmt='csv', compress=False, **filters):
+    """Chunks of the ``kind`` log as CSV or JSON Lines, optionally gzipped.
+
+    Rows come from a chunked server-side cursor and leave as soon as a
+    chunk fills, so memory stays flat however many rows are exported.
+    Filters are validated before the first chunk is produced.
+    """
+    names, rows = export_rows(kind, **filters)
+    lines = csv_lines(names, rows) if fmt == 'csv' else jsonl_lines(names, rows)
+    chunks = _batched(lines)
+    return gzipped(chunks) if compress else chunks
+
+
+def export_filename(kind, fmt, compress=False):
+    return f"{kind}-{timezone.localdate():%Y%m%d}.{fmt}" + ('.gz' if compress else '')
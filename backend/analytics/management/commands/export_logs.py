@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.export import EXPORTS, FORMATS, stream_export, export_filename
+import sys
+
+
+class Command(BaseCommand):
+    help = 'Stream the search or download log to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS), help='Log to export')
+        parser.add_argument('--format', choices=FORMATS, default='csv', help='Output format (default: csv)')
+        parser.add_argument('--start', help='First day or datetime to include (ISO 8601)')
+        parser.add_argument('--end', help='Last day to include, or datetime to stop before (ISO 8601)')
+        parser.add_argument('--user', help='Only rows of this user id or username')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--output', '-o', help="Output file, '-' for stdout (default: <kind>-<date>.<format>[.gz])")
+
+    def handle(self, *args, **options):
+        kind, fmt, compress = options['kind'], options['format'], options['gzip']
+        try:
+            chunks = stream_export(kind, fmt, compress, start=options['start'], end=options['end'], user=options['user'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        path = options['output'] or export_filename(kind, fmt, compress)
+        stream = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        written = 0
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+                written += len(chunk)
+        finally:
+            if stream is not sys.stdout.buffer:
+                stream.close()
+
+        if path != '-':
+            self.stderr.write(self.style.SUCCESS(f'Wrote {written:,} bytes to {path}'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from analytics.retention import prune_logs, DELETE_BATCH
+
+
+def megabytes(size):
+    return 'n/a' if size is None else f'{size / 1024 / 1024:,.1f} MB'
+
+
+class Command(BaseCommand):
+    help = 'Roll up, archive (gzipped JSON Lines) and delete search/download log rows past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep this many days of raw rows (default: LOG_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=DELETE_BATCH, help='Rows deleted per transaction')
+        parser.add_argument('--no-archive', action='store_true', help='Delete without writing archive files')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM and ANALYZE afterwards to return space to the disk')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be removed')
+
+    def handle(self, *args, **options):
+        report = prune_logs(
+            days=options['days'],
+            archive=not options['no_archive'],
+            vacuum=options['vacuum'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+
+        verb = 'would be removed' if options['dry_run'] else 'removed'
+        self.stdout.write(f"Rows older than {report['cutoff']:%Y-%m-%d %H:%M}:")
+        for kind, result in report['logs'].items():
+            self.stdout.write(f"  {kind}: {result['rows']:,} {verb}, {result['archived_bytes']:,} bytes archived (uncompressed)")
+        self.stdout.write(f"  sketch snapshots: {report['sketches']:,} {verb}")
+        self.stdout.write(f"  search timings: {report['timings']:,} {verb}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Database {megabytes(report['size_before'])} -> {megabytes(report['size_after'])}"
+            + (f" ({megabytes(report['reclaimed'])} reclaimed)" if 'reclaimed' in report else '')
+        ))
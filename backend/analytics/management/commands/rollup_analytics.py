@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from analytics.dashboard import warm_dashboards
+from analytics.rollups import roll_up, high_water_marks
+import time
+
+
+class Command(BaseCommand):
+    help = 'Fold new SearchLog/DownloadLog rows into the analytics rollup tables and re-warm the dashboard cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=int, metavar='SECONDS', help='Keep running, rolling up every SECONDS')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                folded = roll_up()
+                marks = high_water_marks()
+                self.stdout.write(self.style.SUCCESS(
+                    ', '.join(f"{name}: {count} rows folded (mark {marks.get(name, 0)})" for name, count in folded.items())
+                ))
+                warm_dashboards()
+            except Exception as e:
+                if not options['loop']:
+                    raise
+                # A locked database or a failed build must not stop the schedule
+                self.stderr.write(f"⚠️ Analytics rollup failed: {e}")
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_sketchsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('search_id', models.CharField(max_length=32)),
+                ('source', models.CharField(max_length=20)),
+                ('latency_ms', models.FloatField()),
+                ('hits', models.IntegerField(default=0)),
+                ('timed_out', models.BooleanField(default=False)),
+                ('error', models.BooleanField(default=False)),
+                ('cache_hit', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['timestamp', 'source'], name='searchtiming_time_source')],
+            },
+        ),
+    ]
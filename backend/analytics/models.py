@@ -1,3 +1,81 @@
 from django.db import models
+from django.utils import timezone
+from resources.models import Resource
 
-# Create your models here.
+class HourlyTotals(models.Model):
+    hour = models.DateTimeField(unique=True)
+    downloads = models.IntegerField(default=0)
+    searches = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 {self.downloads} downloads, {self.searches} searches"
+
+class DailyResourceDownloads(models.Model):
+    day = models.DateField()
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['day', 'resource']
+    
+    def __str__(self):
+        return f"{self.day} resource {self.resource_id}: {self.count}"
+
+class DailySearchQueries(models.Model):
+    day = models.DateField()
+    # Lower-cased, whitespace-collapsed SearchLog.query
+    query = models.CharField(max_length=500)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['day', 'query']
+    
+    def __str__(self):
+        return f"{self.day} {self.query!r}: {self.count}"
+
+class RollupState(models.Model):
+    """High-water mark: the last raw log id folded into the rollups"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+class SketchSnapshot(models.Model):
+    """One worker's heavy-hitter sketch of one day; the dashboard merges every worker's rows"""
+    name = models.CharField(max_length=50)
+    day = models.DateField()
+    worker = models.CharField(max_length=100)
+    # [[key, count], ...] from the Space-Saving summary, heaviest first
+    top = models.JSONField(default=list)
+    # Base64 count-min table, for point estimates of keys outside the top list
+    counts = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['name', 'day', 'worker']
+    
+    def __str__(self):
+        return f"{self.name} {self.day} ({self.worker})"
+
+class SearchTiming(models.Model):
+    """Latency and outcome of one source (or 'total') for one search page"""
+    # Set by the search itself, not on insert, because rows are written in buffered batches
+    timestamp = models.DateTimeField(default=timezone.now)
+    search_id = models.CharField(max_length=32)
+    source = models.CharField(max_length=20)
+    latency_ms = models.FloatField()
+    hits = models.IntegerField(default=0)
+    timed_out = models.BooleanField(default=False)
+    error = models.BooleanField(default=False)
+    cache_hit = models.BooleanField(default=False)
+    
+    class Meta:
+        indexes = [
+            # Percentiles per source per hour: WHERE timestamp >= ? ORDER BY source, hour, latency
+            models.Index(fields=['timestamp', 'source'], name='searchtiming_time_source'),
+        ]
+    
+    def __str__(self):
+        return f"{self.search_id} {self.source}: {self.latency_ms} ms"
@@ -0,0 +1,134 @@
+import gzip
+import os
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .export import EXPORTS, jsonl_lines
+from .models import SketchSnapshot, SearchTiming
+from .rollups import roll_up, high_water_marks
+
+# Raw rows deleted per transaction, and the pause between transactions that lets request writes in
+DELETE_BATCH = 1000
+BATCH_PAUSE = 0.05
+
+
+def database_size():
+    """Bytes used by the database file (SQLite) or the database (PostgreSQL); None elsewhere"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA freelist_count')
+            free = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            return (pages - free) * cursor.fetchone()[0]
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_database_size(current_database())')
+            return cursor.fetchone()[0]
+    return None
+
+
+def compact_database(tables=()):
+    """Give freed pages back to the file system and refresh planner statistics"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('VACUUM')
+            cursor.execute('ANALYZE')
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'VACUUM ANALYZE {connection.ops.quote_name(table)}')
+
+
+def delete_in_batches(queryset, batch_size=DELETE_BATCH):
+    removed = 0
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        with transaction.atomic():
+            removed += queryset.model.objects.filter(id__in=ids).delete()[0]
+        time.sleep(BATCH_PAUSE)
+
+
+def prune_log(kind, cutoff, archive_dir=None, batch_size=DELETE_BATCH, dry_run=False):
+    """Archive and delete the ``kind`` log rows older than ``cutoff``.
+
+    Only rows already folded into the rollups (id at or below the rollup
+    high-water mark) are touched, so the dashboard numbers do not change.
+    Each batch is appended to ``<archive_dir>/<kind>-<YYYY-MM>.jsonl.gz`` and
+    flushed before it is deleted in its own short transaction. Returns
+    (rows removed, archive bytes written).
+    """
+    model, columns = EXPORTS[kind]
+    names = [name for name, _ in columns]
+    expired = model.objects.filter(timestamp__lt=cutoff)
+
+    # A real run rolls everything up first, so a dry run counts past the mark too
+    if dry_run:
+        return expired.count(), 0
+
+    # EXPORTS and the rollups name the logs alike
+    expired = expired.filter(id__lte=high_water_marks().get(kind, 0))
+
+    removed = written = 0
+    archives = {}
+    try:
+        while True:
+            rows = list(expired.order_by('id').values_list(*[lookup for _, lookup in columns])[:batch_size])
+            if not rows:
+                break
+
+            if archive_dir:
+                for row in rows:
+                    month = row[1].strftime('%Y-%m')
+                    if month not in archives:
+                        archives[month] = gzip.open(os.path.join(archive_dir, f'{kind}-{month}.jsonl.gz'), 'ab')
+                    data = b''.join(jsonl_lines(names, [row]))
+                    archives[month].write(data)
+                    written += len(data)
+                for archive in archives.values():
+                    archive.flush()
+                    os.fsync(archive.fileno())
+
+            with transaction.atomic():
+                removed += model.objects.filter(id__in=[row[0] for row in rows]).delete()[0]
+            time.sleep(BATCH_PAUSE)
+    finally:
+        for archive in archives.values():
+            archive.close()
+    return removed, written
+
+
+def prune_logs(days=None, archive=True, vacuum=False, batch_size=DELETE_BATCH, dry_run=False):
+    """Roll up, archive and delete raw log rows older than ``days`` (LOG_RETENTION_DAYS)"""
+    days = days if days is not None else getattr(settings, 'LOG_RETENTION_DAYS', 365)
+    cutoff = timezone.now() - timedelta(days=days)
+    archive_dir = str(getattr(settings, 'LOG_ARCHIVE_DIR', settings.BASE_DIR / 'log_archive')) if archive else None
+    if archive_dir and not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    # Rows only become deletable once they are in the rollups
+    if not dry_run:
+        roll_up()
+
+    size_before = database_size()
+    report = {'cutoff': cutoff, 'logs': {}}
+    for kind in EXPORTS:
+        removed, written = prune_log(kind, cutoff, archive_dir, batch_size, dry_run)
+        report['logs'][kind] = {'rows': removed, 'archived_bytes': written}
+
+    # Per-day sketches past the window are never read again
+    stale_sketches = SketchSnapshot.objects.filter(day__lt=cutoff.date())
+    report['sketches'] = stale_sketches.count() if dry_run else stale_sketches.delete()[0]
+    stale_timings = SearchTiming.objects.filter(timestamp__lt=cutoff)
+    report['timings'] = stale_timings.count() if dry_run else delete_in_batches(stale_timings, batch_size)
+
+    if vacuum and not dry_run:
+        compact_database([model._meta.db_table for model, _ in EXPORTS.values()] + [SearchTiming._meta.db_table])
+    size_after = database_size()
+    report['size_before'], report['size_after'] = size_before, size_after
+    if size_before is not None and size_after is not None:
+        report['reclaimed'] = size_before - size_after
+    return report
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+from resources.caching import bump_version
+from resources.models import SearchLog, DownloadLog
+from .models import HourlyTotals, DailyResourceDownloads, DailySearchQueries, RollupState
+
+# Raw rows younger than this are left for the next run so in-flight inserts are not skipped
+ROLLUP_LAG = timedelta(seconds=5)
+# Raw log ids folded per transaction
+ROLLUP_BATCH = 50000
+
+
+def normalize_query(query):
+    return ' '.join(str(query or '').lower().split())[:500]
+
+
+def add_counts(model, unique_fields, counts, count_field='count'):
+    """Add ``counts`` ({unique field values: n}) onto existing rollup rows, creating missing ones"""
+    if not counts:
+        return
+
+    first = unique_fields[0]
+    existing = {
+        tuple(row[:-1]): row[-1]
+        for row in model.objects.filter(
+            **{f'{first}__in': {key[0] for key in counts}}
+        ).values_list(*unique_fields, count_field)
+        if tuple(row[:-1]) in counts
+    }
+
+    model.objects.bulk_create(
+        [
+            model(**dict(zip(unique_fields, key)), **{count_field: existing.get(key, 0) + count})
+            for key, count in counts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=[field.replace('_id', '') for field in unique_fields],
+        update_fields=[count_field]
+    )
+
+
+def hourly_counts(rows):
+    return {
+        (row['hour'],): row['count']
+        for row in rows.annotate(hour=TruncHour('timestamp')).values('hour').annotate(count=Count('id'))
+    }
+
+
+def fold_downloads(rows):
+    per_resource = rows.annotate(day=TruncDate('timestamp')).values('day', 'resource').annotate(count=Count('id'))
+    add_counts(
+        DailyResourceDownloads, ('day', 'resource_id'),
+        {(row['day'], row['resource']): row['count'] for row in per_resource}
+    )
+    add_counts(HourlyTotals, ('hour',), hourly_counts(rows), 'downloads')
+
+
+def fold_searches(rows):
+    per_query = {}
+    for row in rows.annotate(day=TruncDate('timestamp')).values('day', 'query').annotate(count=Count('id')):
+        query = normalize_query(row['query'])
+        if query:
+            key = (row['day'], query)
+            per_query[key] = per_query.get(key, 0) + row['count']
+    add_counts(DailySearchQueries, ('day', 'query'), per_query)
+    add_counts(HourlyTotals, ('hour',), hourly_counts(rows), 'searches')
+
+
+ROLLUPS = (
+    ('downloads', DownloadLog, fold_downloads),
+    ('searches', SearchLog, fold_searches),
+)
+
+
+def roll_up():
+    """Fold raw log rows past each high-water mark into the rollup tables.
+
+    Every batch is one transaction that also moves the mark, so a crash
+    never counts a row twice or drops it. Returns the raw rows folded per log.
+    """
+    folded = {}
+    for name, model, fold in ROLLUPS:
+        folded[name] = 0
+        while True:
+            with transaction.atomic():
+                state, _ = RollupState.objects.select_for_update().get_or_create(name=name)
+                settled = model.objects.filter(
+                    id__gt=state.last_id,
+                    id__lte=state.last_id + ROLLUP_BATCH,
+                    timestamp__lt=timezone.now() - ROLLUP_LAG
+                ).aggregate(top=Max('id'))['top']
+                if not settled:
+                    break
+
+                rows = model.objects.filter(id__gt=state.last_id, id__lte=settled)
+                folded[name] += rows.count()
+                fold(rows)
+                state.last_id = settled
+                state.save(update_fields=['last_id', 'updated_at'])
+
+    # Cached dashboards built from the previous rollups are now stale
+    if any(folded.values()):
+        bump_version('analytics')
+    return folded
+
+
+def high_water_marks():
+    return dict(RollupState.objects.values_list('name', 'last_id'))
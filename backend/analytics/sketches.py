@@ -0,0 +1,225 @@
+import atexit
+import base64
+import hashlib
+import os
+import socket
+import threading
+import time
+from array import array
+from collections import Counter
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+from .models import SketchSnapshot
+from .rollups import normalize_query
+
+# Count-min dimensions: estimates overshoot by at most ~e/WIDTH of the day's total with probability 1 - e^-DEPTH
+CMS_WIDTH = 1024
+CMS_DEPTH = 4
+# Keys kept by each Space-Saving summary; the dashboard shows the top 10
+TOP_K = 100
+# Seconds between snapshots of a worker's sketches to the database
+SNAPSHOT_INTERVAL = 30
+
+WORKER = f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CountMinSketch:
+    """DEPTH rows of WIDTH counters; a key's estimate is the smallest of its counters"""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, table=None):
+        self.width, self.depth = width, depth
+        self.table = table if table is not None else array('Q', bytes(8 * width * depth))
+
+    def _cells(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        return [
+            row * self.width + int.from_bytes(digest[8 * row:8 * row + 8], 'little') % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key, count=1):
+        for cell in self._cells(key):
+            self.table[cell] += count
+
+    def estimate(self, key):
+        return min(self.table[cell] for cell in self._cells(key))
+
+    def dumps(self):
+        return base64.b64encode(self.table.tobytes()).decode()
+
+    @classmethod
+    def loads(cls, data):
+        table = array('Q')
+        table.frombytes(base64.b64decode(data))
+        return cls(table=table)
+
+
+class SpaceSaving:
+    """At most ``k`` counters; a new key past capacity takes over the smallest one.
+
+    Every key seen more than total/k times is guaranteed to be present, and
+    each count overshoots by at most the count of the counter it replaced.
+    """
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.counters = {}
+
+    def add(self, key, count=1):
+        if key in self.counters:
+            self.counters[key] += count
+        elif len(self.counters) < self.k:
+            self.counters[key] = count
+        else:
+            victim = min(self.counters, key=self.counters.get)
+            self.counters[key] = self.counters.pop(victim) + count
+
+    def top(self, n=None):
+        return Counter(self.counters).most_common(n)
+
+
+class HeavyHitters:
+    """Space-Saving top-k whose counts are clipped by a count-min sketch of the same stream"""
+
+    def __init__(self):
+        self.sketch = CountMinSketch()
+        self.summary = SpaceSaving()
+
+    def add(self, key, count=1):
+        self.sketch.add(key, count)
+        self.summary.add(key, count)
+
+    def top(self, n=None):
+        return [[key, min(count, self.sketch.estimate(key))] for key, count in self.summary.top(n)]
+
+
+_lock = threading.Lock()
+_day = None
+_live = {}
+_retired = []
+_snapshot_at = time.time()
+_snapshot_lock = threading.Lock()
+
+
+def record(name, key):
+    """Count one event for ``key`` in today's ``name`` sketch; called on the request path"""
+    global _day, _live
+    today = timezone.localdate()
+    with _lock:
+        if today != _day:
+            if _live:
+                _retired.append((_day, _live))
+            _day, _live = today, {}
+        if name not in _live:
+            _live[name] = HeavyHitters()
+        _live[name].add(key)
+
+    if time.time() - _snapshot_at > SNAPSHOT_INTERVAL and _snapshot_lock.acquire(blocking=False):
+        threading.Thread(target=_snapshot_in_background, daemon=True, name='sketch-snapshot').start()
+
+
+def record_search(query):
+    query = normalize_query(query)
+    if query:
+        record('queries', query)
+
+
+def record_download(resource_id):
+    record('resources', str(resource_id))
+
+
+def snapshot():
+    """Upsert this worker's sketches (today's and any days not yet saved) into SketchSnapshot"""
+    global _snapshot_at
+    with _lock:
+        days = _retired + [(_day, _live)]
+        rows = [
+            SketchSnapshot(name=name, day=day, worker=WORKER, top=sketch.top(), counts=sketch.sketch.dumps())
+            for day, sketches in days
+            for name, sketch in list(sketches.items())
+        ]
+        retired = len(_retired)
+
+    if rows:
+        SketchSnapshot.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['name', 'day', 'worker'],
+            update_fields=['top', 'counts', 'updated_at']
+        )
+    with _lock:
+        del _retired[:retired]
+    _snapshot_at = time.time()
+
+
+def _snapshot_in_background():
+    try:
+        snapshot()
+    except Exception as e:
+        print(f"⚠️ Sketch snapshot failed: {e}")
+    finally:
+        connection.close()
+        _snapshot_lock.release()
+
+
+def _snapshot_at_exit():
+    try:
+        snapshot()
+    except Exception as e:
+        print(f"⚠️ Sketch snapshot failed: {e}")
+
+
+atexit.register(_snapshot_at_exit)
+
+
+def first_day(name):
+    """Earliest day with ``name`` sketches, saved or in this worker's memory; None if there are none"""
+    with _lock:
+        days = [day for day, sketches in _retired + [(_day, _live)] if name in sketches]
+    days.append(SketchSnapshot.objects.filter(name=name).aggregate(first=Min('day'))['first'])
+    return min((day for day in days if day is not None), default=None)
+
+
+def top(name, start_day, n=10):
+    """Merged [(key, count)] heaviest ``name`` keys since ``start_day`` across all workers.
+
+    Each worker-day snapshot contributes its Space-Saving counts. A candidate
+    missing from a full summary may still have been seen there, as often as
+    the summary's smallest counter; its count-min estimate, capped at that,
+    is added instead. This worker's unsaved counts come from memory so the
+    result is near real time.
+    """
+    with _lock:
+        live = [
+            (day, sketches[name].top(), sketches[name].sketch)
+            for day, sketches in _retired + [(_day, _live)]
+            if name in sketches
+        ]
+
+    stored = SketchSnapshot.objects.filter(name=name, day__gte=start_day).exclude(
+        worker=WORKER, day__in=[day for day, _, _ in live]
+    )
+    summaries = [(entries, sketch) for day, entries, sketch in live if day >= start_day]
+    summaries += list(stored.values_list('top', 'counts'))
+
+    merged = Counter()
+    for entries, _ in summaries:
+        for key, count in entries:
+            merged[key] += count
+    candidates = Counter(dict(merged.most_common(max(n, TOP_K))))
+
+    for entries, sketch in summaries:
+        # A summary below capacity counted every key, so a key it lacks was never seen
+        if len(entries) < TOP_K or not sketch:
+            continue
+        counts = dict(entries)
+        missing = [key for key in candidates if key not in counts]
+        if not missing:
+            continue
+        if isinstance(sketch, str):
+            sketch = CountMinSketch.loads(sketch)
+        floor = min(counts.values())
+        for key in missing:
+            candidates[key] += min(sketch.estimate(key), floor)
+    return candidates.most_common(n)
@@ -0,0 +1,139 @@
+import atexit
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.db import connection
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from .models import SearchTiming
+
+# Buffered rows are written once there are this many, or the oldest is this many seconds old
+FLUSH_SIZE = 200
+FLUSH_INTERVAL = 5
+# Rows kept in memory if the database stays unavailable; older ones are dropped
+MAX_BUFFERED = 10000
+
+PERCENTILES = (50, 95, 99)
+
+
+class TelemetryBuffer:
+    """Collects SearchTiming rows in memory and bulk-inserts them from a background thread"""
+
+    def __init__(self):
+        self.rows = []
+        self.lock = threading.Lock()
+        self.flushing = threading.Lock()
+        self.oldest = None
+
+    def add(self, rows):
+        with self.lock:
+            if self.oldest is None:
+                self.oldest = time.time()
+            self.rows.extend(rows)
+            del self.rows[:-MAX_BUFFERED]
+            due = len(self.rows) >= FLUSH_SIZE or time.time() - self.oldest > FLUSH_INTERVAL
+        if due and self.flushing.acquire(blocking=False):
+            threading.Thread(target=self._flush_in_background, daemon=True, name='telemetry-flush').start()
+
+    def flush(self):
+        with self.lock:
+            rows, self.rows, self.oldest = self.rows, [], None
+        if not rows:
+            return 0
+        try:
+            SearchTiming.objects.bulk_create(rows, batch_size=FLUSH_SIZE)
+        except Exception:
+            # Put them back for the next attempt
+            with self.lock:
+                self.rows[:0] = rows
+                del self.rows[:-MAX_BUFFERED]
+                self.oldest = self.oldest or time.time()
+            raise
+        return len(rows)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Search telemetry flush failed: {e}")
+        finally:
+            connection.close()
+            self.flushing.release()
+
+
+buffer = TelemetryBuffer()
+
+
+def _flush_at_exit():
+    try:
+        buffer.flush()
+    except Exception as e:
+        print(f"⚠️ Search telemetry flush failed: {e}")
+
+
+atexit.register(_flush_at_exit)
+
+
+def record_search_timing(timings, total_ms):
+    """Queue one row per source in ``timings`` plus a 'total' row for the whole page"""
+    now = timezone.now()
+    search_id = uuid.uuid4().hex
+    rows = [SearchTiming(timestamp=now, search_id=search_id, source=source, **timing) for source, timing in timings.items()]
+    remote = [timing for source, timing in timings.items() if source != 'local']
+    rows.append(SearchTiming(
+        timestamp=now, search_id=search_id, source='total', latency_ms=total_ms,
+        hits=sum(timing['hits'] for timing in timings.values()),
+        timed_out=any(timing['timed_out'] for timing in remote),
+        error=any(timing['error'] for timing in remote),
+        # Every remote source answered from the page buffer
+        cache_hit=bool(remote) and all(timing['cache_hit'] for timing in remote)
+    ))
+    buffer.add(rows)
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, -(-p * len(ordered) // 100))
+    return ordered[rank - 1]
+
+
+def latency_report(hours=24, source=None):
+    """{source: [per-hour latency percentiles, hit and failure counts]} over the last ``hours``.
+
+    Rows arrive sorted by (source, hour, latency), so only one hour of one
+    source is held in memory at a time.
+    """
+    rows = SearchTiming.objects.filter(timestamp__gte=timezone.now() - timedelta(hours=hours))
+    if source:
+        rows = rows.filter(source=source)
+    rows = rows.annotate(hour=TruncHour('timestamp')).order_by('source', 'hour', 'latency_ms').values_list(
+        'source', 'hour', 'latency_ms', 'hits', 'timed_out', 'error', 'cache_hit'
+    )
+
+    report = {}
+    group, latencies, totals = None, [], None
+
+    def close_group():
+        if group is None:
+            return
+        count = len(latencies)
+        entry = {'hour': group[1].isoformat(), 'count': count}
+        entry.update({f'p{p}': round(percentile(latencies, p), 2) for p in PERCENTILES})
+        entry.update({
+            'timeouts': totals[1], 'errors': totals[2], 'cache_hits': totals[3],
+            'avg_hits': round(totals[0] / count, 2)
+        })
+        report.setdefault(group[0], []).append(entry)
+
+    for row_source, hour, latency, hits, timed_out, error, cache_hit in rows.iterator(chunk_size=2000):
+        if (row_source, hour) != group:
+            close_group()
+            group, latencies, totals = (row_source, hour), [], [0, 0, 0, 0]
+        latencies.append(latency)
+        totals[0] += hits
+        totals[1] += timed_out
+        totals[2] += error
+        totals[3] += cache_hit
+    close_group()
+    return report
@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('dashboard/', views.analytics_dashboard, name='analytics_dashboard'),
+    path('search-latency/', views.search_latency, name='search_latency'),
+    path('export/<str:kind>/', views.export_logs, name='export_logs'),
 ]
\ No newline at end of file
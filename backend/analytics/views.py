@@ -1,10 +1,10 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count, Q
-from django.utils import timezone
-from datetime import timedelta
-from resources.models import Resource, SearchLog, DownloadLog
+from django.http import StreamingHttpResponse
+from .dashboard import dashboard_payload
+from .export import EXPORTS, FORMATS, stream_export, export_filename
+from .telemetry import latency_report, PERCENTILES
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -12,44 +12,55 @@ def analytics_dashboard(request):
     if request.user.role != 'admin':
         return Response({'error': 'Admin access required'}, status=403)
     
-    # Date range filter
-    days = int(request.GET.get('days', 30))
-    start_date = timezone.now() - timedelta(days=days)
+    # Date range filter; each window is a separate cache entry, so keep them within reason
+    days = max(1, min(int(request.GET.get('days', 30)), 3650))
     
-    # Downloads per month
-    downloads_data = DownloadLog.objects.filter(
-        timestamp__gte=start_date
-    ).extra(
-        select={'month': "strftime('%%Y-%%m', timestamp)"}
-    ).values('month').annotate(count=Count('id')).order_by('month')
+    payload = dashboard_payload(days)
+    # 202 while the first build of this window is still running
+    return Response(payload, status=202 if payload.get('pending') else 200)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_latency(request):
+    """Per-source, per-hour search latency percentiles (?hours=24&source=koha)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=403)
     
-    # Top searched keywords
-    search_data = SearchLog.objects.filter(
-        timestamp__gte=start_date
-    ).values('query').annotate(count=Count('id')).order_by('-count')[:10]
+    hours = max(1, min(int(request.GET.get('hours', 24)), 24 * 31))
+    source = request.GET.get('source', '')
     
-    # Resource source distribution
-    source_data = Resource.objects.values('source').annotate(count=Count('id'))
+    return Response({
+        'hours': hours,
+        'percentiles': [f'p{p}' for p in PERCENTILES],
+        'sources': latency_report(hours, source)
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_logs(request, kind):
+    """Stream the search or download log as CSV or JSON Lines (?output=csv|jsonl&gzip=1&start=&end=&user=)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=403)
+    if kind not in EXPORTS:
+        return Response({'error': f"Unknown log '{kind}'"}, status=404)
     
-    # Most accessed materials
-    popular_resources = Resource.objects.filter(
-        download_count__gt=0
-    ).order_by('-download_count')[:10].values('title', 'download_count')
+    # ``format`` is taken by DRF's format override
+    fmt = request.GET.get('output', 'csv')
+    if fmt not in FORMATS:
+        return Response({'error': f"output must be one of {', '.join(FORMATS)}"}, status=400)
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
     
-    # User activity timeline
-    activity_data = DownloadLog.objects.filter(
-        timestamp__gte=start_date
-    ).extra(
-        select={'date': "date(timestamp)"}
-    ).values('date').annotate(count=Count('id')).order_by('date')
+    try:
+        chunks = stream_export(
+            kind, fmt, compress,
+            start=request.GET.get('start'), end=request.GET.get('end'), user=request.GET.get('user')
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     
-    return Response({
-        'downloads_per_month': list(downloads_data),
-        'top_searches': list(search_data),
-        'source_distribution': list(source_data),
-        'popular_resources': list(popular_resources),
-        'user_activity': list(activity_data),
-        'total_resources': Resource.objects.count(),
-        'total_downloads': DownloadLog.objects.count(),
-        'total_searches': SearchLog.objects.count(),
-    })
\ No newline at end of file
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(chunks, content_type='application/gzip' if compress else content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, compress)}"'
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
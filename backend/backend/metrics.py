@@ -0,0 +1,196 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+from django.http import HttpResponse
+
+# Seconds between dumps of a worker's values to the multiprocess directory
+DUMP_INTERVAL = 5
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-f]{8}-[0-9a-f-]{27}|[0-9a-f]{24,})$', re.IGNORECASE)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def snapshot(self):
+        with self.lock:
+            return {json.dumps(labels): self.copy(value) for labels, value in self.values.items()}
+
+    def label_text(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    @staticmethod
+    def copy(value):
+        return value
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def lines(self, values):
+        for labels, value in values:
+            yield f'{self.name}{self.label_text(labels)} {value}'
+
+
+class Histogram(Metric):
+    """Fixed buckets; each observation is one bisect and three additions under the lock"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @staticmethod
+    def copy(value):
+        return [list(value[0]), value[1]]
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1]]
+
+    def lines(self, values):
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{self.label_text(labels, [("le", bound)])} {cumulative}'
+            yield f'{self.name}_sum{self.label_text(labels)} {total}'
+            yield f'{self.name}_count{self.label_text(labels)} {cumulative}'
+
+
+REGISTRY = []
+
+REQUESTS = Counter('http_requests_total', 'HTTP requests handled', ['view', 'method', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Time spent in the Django view stack', ['view'])
+REQUEST_QUERIES = Histogram('http_request_db_queries', 'Database queries per request', ['view'], QUERY_BUCKETS)
+UPLOAD_BYTES = Counter('http_upload_bytes_total', 'Bytes received in multipart uploads', ['view'])
+OUTBOUND_LATENCY = Histogram(
+    'outbound_request_duration_seconds', 'Time to response headers of calls to Koha, DSpace and VuFind',
+    ['source', 'endpoint', 'status']
+)
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by cache and result', ['cache', 'result'])
+
+
+def multiprocess_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', None) or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+_dumped_at = 0.0
+
+
+def dump(force=False):
+    """Write this process's values to ``<dir>/metrics-<pid>.json`` (at most every DUMP_INTERVAL s)"""
+    global _dumped_at
+    directory = multiprocess_dir()
+    if not directory or (not force and time.time() - _dumped_at < DUMP_INTERVAL):
+        return
+    _dumped_at = time.time()
+
+    data = {metric.name: metric.snapshot() for metric in REGISTRY}
+    path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+    with open(path + '.tmp', 'w') as stream:
+        json.dump(data, stream)
+    os.replace(path + '.tmp', path)
+
+
+def collect():
+    """{metric name: {labels: value}} summed over every worker that has dumped (or just this process)"""
+    directory = multiprocess_dir()
+    if not directory:
+        return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+    dump(force=True)
+    merged = {metric.name: {} for metric in REGISTRY}
+    kinds = {metric.name: metric for metric in REGISTRY}
+    # Files of exited workers stay, so counters never go backwards
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        try:
+            with open(path) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            continue
+        for name, values in data.items():
+            if name not in kinds:
+                continue
+            for labels, value in values.items():
+                merged[name][labels] = kinds[name].merge(merged[name].get(labels), value)
+    return merged
+
+
+def render():
+    values = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.lines(sorted(
+            (tuple(json.loads(labels)), value) for labels, value in values[metric.name].items()
+        )))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+def endpoint_label(path):
+    """URL path with ids replaced, so label values stay few"""
+    return '/'.join(':id' if ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def instrument_session(session, source):
+    """Observe the latency of every response a requests.Session receives"""
+    def observe(response, *args, **kwargs):
+        OUTBOUND_LATENCY.observe(
+            response.elapsed.total_seconds(), source,
+            endpoint_label(response.request.path_url.split('?', 1)[0]), str(response.status_code)
+        )
+    session.hooks['response'].append(observe)
+    return session
+
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.inc(cache, 'hit' if hit else 'miss')
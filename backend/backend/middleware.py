@@ -0,0 +1,164 @@
+import random
+import re
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from . import metrics, profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def accepted_encodings(header):
+    """Map of encoding -> q-value from an Accept-Encoding header"""
+    encodings = {}
+    for part in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if match:
+            try:
+                encodings[match.group(1).lower()] = float(match.group(2) or 1)
+            except ValueError:
+                continue
+    return encodings
+
+
+class CompressionMiddleware:
+    """Brotli or gzip compression for responses above COMPRESSION_MIN_SIZE bytes.
+
+    Works like django.middleware.gzip.GZipMiddleware (including its BREACH
+    padding for gzip) but prefers brotli when the client accepts it and the
+    brotli package is installed. Streaming responses are left untouched so
+    server-sent events are flushed as they are produced.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+
+        encoding = self.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if not encoding:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=5)
+        else:
+            compressed = compress_string(response.content, max_random_bytes=100)
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # The body is no longer byte-for-byte what a strong ETag promised
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+
+        return response
+
+    def choose_encoding(self, header):
+        encodings = accepted_encodings(header)
+        if brotli is not None and encodings.get('br', 0) > 0:
+            return 'br'
+        if encodings.get('gzip', encodings.get('*', 0)) > 0:
+            return 'gzip'
+        return None
+
+
+class MetricsMiddleware:
+    """Request count, latency, database queries and upload bytes per view for /metrics.
+
+    Costs two clock reads, a counting wrapper per SQL query and a few
+    locked dictionary updates per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.REQUESTS.inc(view, request.method, str(response.status_code))
+        metrics.REQUEST_LATENCY.observe(elapsed, view)
+        metrics.REQUEST_QUERIES.observe(queries[0], view)
+        if request.META.get('CONTENT_TYPE', '').startswith('multipart/form-data'):
+            metrics.UPLOAD_BYTES.inc(view, amount=int(request.META.get('CONTENT_LENGTH') or 0))
+        metrics.dump()
+        return response
+
+
+class ProfilingMiddleware:
+    """Samples the stacks of PROFILE_SAMPLE_RATE of requests, plus admin requests sent with ``X-Profile: 1``.
+
+    Stacks are saved per view under PROFILE_DIR and served by the profile
+    endpoints. Unless PROFILING_ENABLED is set the middleware removes itself
+    at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+        self.interval = getattr(settings, 'PROFILE_INTERVAL', 0.005)
+
+    def __call__(self, request):
+        if not (random.random() < self.sample_rate or self.requested_by_admin(request)):
+            return self.get_response(request)
+
+        with profiling.StackSampler(threading.get_ident(), self.interval) as sampler:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        try:
+            profiling.save_stacks(match.view_name if match else 'unmatched', sampler.stacks)
+        except OSError as e:
+            print(f"⚠️ Saving profile failed: {e}")
+        return response
+
+    def requested_by_admin(self, request):
+        if request.META.get('HTTP_X_PROFILE') != '1':
+            return False
+        # DRF token auth only runs inside the views, so check the token here
+        try:
+            authenticated = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = authenticated[0] if authenticated else getattr(request, 'user', None)
+        return bool(user and user.is_authenticated and getattr(user, 'role', None) == 'admin')
@@ -0,0 +1,149 @@
+import glob
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+# Deepest stack kept per sample; deeper frames are cut at the root end
+MAX_DEPTH = 128
+SAFE_NAME = re.compile(r'[^\w.-]+')
+
+
+def profile_dir():
+    return str(getattr(settings, 'PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Samples one thread's stack every ``interval`` seconds from a helper thread.
+
+    Stacks are counted in collapsed form (root;...;leaf), so time spent
+    waiting on SQL or HTTP shows up under the frames doing the waiting,
+    which a deterministic profiler like cProfile would not attribute.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True, name='stack-sampler')
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and len(names) < MAX_DEPTH:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+_write_lock = threading.Lock()
+
+
+def save_stacks(view, stacks):
+    """Add ``stacks`` to this process's collapsed-stack file for ``view``"""
+    if not stacks:
+        return
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    # One file per process, so workers never rewrite each other's counts
+    path = os.path.join(directory, f'{SAFE_NAME.sub("_", view)}.{os.getpid()}.collapsed')
+    with _write_lock:
+        totals = read_stacks([path])
+        totals.update(stacks)
+        with open(path + '.tmp', 'w') as stream:
+            stream.writelines(f'{stack} {count}\n' for stack, count in totals.most_common())
+        os.replace(path + '.tmp', path)
+
+
+def read_stacks(paths):
+    totals = Counter()
+    for path in paths:
+        try:
+            with open(path) as stream:
+                for line in stream:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack and count.isdigit():
+                        totals[stack] += int(count)
+        except OSError:
+            continue
+    return totals
+
+
+def list_profiles():
+    """[{view, samples, bytes, updated_at}] for every view with saved stacks"""
+    views = {}
+    for path in glob.glob(os.path.join(profile_dir(), '*.collapsed')):
+        view = os.path.basename(path).rsplit('.', 2)[0]
+        entry = views.setdefault(view, {'view': view, 'files': 0, 'bytes': 0, 'updated_at': 0})
+        entry['files'] += 1
+        entry['bytes'] += os.path.getsize(path)
+        entry['updated_at'] = max(entry['updated_at'], os.path.getmtime(path))
+    for entry in views.values():
+        entry['samples'] = sum(read_stacks(profile_paths(entry['view'])).values())
+        entry['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(entry['updated_at']))
+    return sorted(views.values(), key=lambda entry: entry['view'])
+
+
+def profile_paths(view):
+    return glob.glob(os.path.join(profile_dir(), f'{glob.escape(SAFE_NAME.sub("_", view))}.[0-9]*.collapsed'))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profile_list(request):
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=403)
+
+    return Response({
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'sample_rate': getattr(settings, 'PROFILE_SAMPLE_RATE', 0),
+        'profiles': list_profiles()
+    })
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def profile_detail(request, view):
+    """Merged collapsed stacks of one view (for flamegraph.pl or speedscope); DELETE clears them"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=403)
+
+    paths = profile_paths(view)
+    if not paths:
+        return Response({'error': 'No profile for this view'}, status=404)
+
+    if request.method == 'DELETE':
+        for path in paths:
+            os.remove(path)
+        return Response(status=204)
+
+    stacks = read_stacks(paths)
+    response = HttpResponse(
+        ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()),
+        content_type='text/plain; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{SAFE_NAME.sub("_", view)}.collapsed"'
+    return response
@@ -24,7 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'backend.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -32,6 +34,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -61,6 +64,20 @@ DATABASES = {
     }
 }
 
+# File based so cache versions, ETags and paging state are shared by all gunicorn workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        # The default of 300 entries is far too few for per-query pages, facets and ETags;
+        # past MAX_ENTRIES a third of the files is culled instead of half
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_FREQUENCY': 3,
+        },
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -83,8 +100,33 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'resources.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Seconds before a search ETag expires even if no local Resource changed
+SEARCH_ETAG_TTL = 60
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+# Directory where each gunicorn worker dumps its /metrics values so any worker can report the sum
+# (PROMETHEUS_MULTIPROC_DIR in the environment also works); None keeps them per process
+METRICS_MULTIPROC_DIR = None
+
+# Stack-sampling profiler: off unless enabled; then profiles this share of requests, plus admin
+# requests sent with "X-Profile: 1", sampling every PROFILE_INTERVAL seconds into PROFILE_DIR
+PROFILING_ENABLED = False
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_INTERVAL = 0.005
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+# SearchLog/DownloadLog rows older than this many days are archived and deleted by prune_logs
+LOG_RETENTION_DAYS = 365
+LOG_ARCHIVE_DIR = BASE_DIR / 'log_archive'
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -97,8 +139,11 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
+    'x-profile',
     'x-requested-with',
 ]
+# Keyset-paginated listings announce their next page in these headers
+CORS_EXPOSE_HEADERS = ['Link', 'X-Next-Cursor']
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -113,6 +158,7 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
+    'x-profile',
     'x-requested-with',
 ]
 
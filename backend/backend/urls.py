@@ -2,9 +2,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
+from .profiling import profile_list, profile_detail
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('api/profiles/', profile_list, name='profile_list'),
+    path('api/profiles/<str:view>/', profile_detail, name='profile_detail'),
     path('api/auth/', include('authentication.urls')),
     path('api/resources/', include('resources.urls')),
     path('api/analytics/', include('analytics.urls')),
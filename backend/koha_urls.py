@@ -3,5 +3,7 @@ from resources import koha_views, auth_views
 
 urlpatterns = [
     path('create-biblio/', koha_views.create_biblio, name='create_biblio'),
+    path('bulk-catalog/', koha_views.bulk_catalog, name='bulk_catalog'),
+    path('bulk-catalog/<str:job>/', koha_views.bulk_catalog_status, name='bulk_catalog_status'),
     path('authenticate/', auth_views.authenticate_koha, name='authenticate_koha'),
 ]
\ No newline at end of file
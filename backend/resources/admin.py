@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Resource, SearchLog, DownloadLog
+from .models import Resource, SearchLog, DownloadLog, WorkIdentifier
 
 @admin.register(Resource)
 class ResourceAdmin(admin.ModelAdmin):
@@ -17,4 +17,10 @@ class SearchLogAdmin(admin.ModelAdmin):
 class DownloadLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'resource', 'timestamp']
     list_filter = ['timestamp']
-    search_fields = ['user__username', 'resource__title']
\ No newline at end of file
+    search_fields = ['user__username', 'resource__title']
+
+@admin.register(WorkIdentifier)
+class WorkIdentifierAdmin(admin.ModelAdmin):
+    list_display = ['scheme', 'value', 'work', 'resource', 'created_at']
+    list_filter = ['scheme']
+    search_fields = ['value', 'work']
@@ -0,0 +1,79 @@
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
+VERSION_PREFIX = 'version:'
+
+
+def get_version(namespace):
+    """Opaque token that changes whenever bump_version(namespace) is called"""
+    key = VERSION_PREFIX + namespace
+    version = cache.get(key)
+    if version is None:
+        # Unknown (cold or evicted) versions start fresh, which only costs a cache miss
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*namespaces):
+    token = time.time_ns()
+    cache.set_many({VERSION_PREFIX + namespace: token for namespace in namespaces}, timeout=None)
+
+
+def make_etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def search_etag(request):
+    # Remote sources change without telling us, so search tags also roll over every SEARCH_ETAG_TTL seconds
+    bucket = int(time.time() // getattr(settings, 'SEARCH_ETAG_TTL', 60))
+    return make_etag('search', request.GET.urlencode(), get_version('resources'), bucket)
+
+
+def recent_etag(request):
+    return make_etag('recent', request.GET.urlencode(), get_version('resources'))
+
+
+def resource_etag(request, resource_id):
+    return make_etag(
+        'resource', resource_id, request.GET.urlencode(),
+        get_version('resources:bulk'), get_version(f'resource:{resource_id}')
+    )
+
+
+def cached_view(etag_func, max_age, weak=False):
+    """@etag plus @cache_control(public=True, max_age=...), applied to 200 responses only.
+
+    A matching If-None-Match gets a 304 without running the view; errors are
+    neither tagged nor publicly cacheable. ``weak`` marks bodies that may
+    differ in details the tag does not cover, such as a view counter.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            tag = quote_etag(etag_func(request, *args, **kwargs))
+            if weak:
+                tag = 'W/' + tag
+
+            if request.method in ('GET', 'HEAD'):
+                # If-None-Match always uses the weak comparison
+                sent = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+                if '*' in sent or tag.removeprefix('W/') in [value.removeprefix('W/') for value in sent]:
+                    response = HttpResponseNotModified()
+                    response['ETag'] = tag
+                    patch_cache_control(response, public=True, max_age=max_age)
+                    return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault('ETag', tag)
+                patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,275 @@
+import base64
+import binascii
+import json
+import time
+import uuid
+from concurrent.futures import as_completed
+from django.core.cache import cache
+from backend.metrics import record_cache
+from .services import ResourceService, SEARCH_EXECUTOR, REMOTE_SOURCES, FACET_FIELDS
+from .ranking import BM25Scorer, merge_top_k
+from .identifiers import collapse_duplicates
+
+CURSOR_VERSION = 1
+# Fetched-but-unserved hits are kept this long for the next page
+BUFFER_TIMEOUT = 600
+BUFFER_PREFIX = 'federated-search:'
+# The source APIs give up after 10 s and return no hits; an empty fetch that slow counts as a timeout
+SOURCE_TIMEOUT = 10
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Malformed cursor')
+
+    if not isinstance(state, dict) or state.get('v') != CURSOR_VERSION:
+        raise InvalidCursor('Unsupported cursor')
+    if not isinstance(state.get('s'), dict) or not isinstance(state.get('f'), dict):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(state.get('q', ''), str) or not isinstance(state.get('b'), (str, type(None))):
+        raise InvalidCursor('Malformed cursor')
+    if type(state.get('l', 20)) is not int or state.get('l', 20) < 1:
+        raise InvalidCursor('Malformed cursor')
+
+    # Everything below is used as-is, so a tampered cursor must not get past here
+    for source, position in state['s'].items():
+        if source not in REMOTE_SOURCES + ('local',) or not isinstance(position, dict):
+            raise InvalidCursor('Malformed cursor')
+        if set(position) != {'c', 'o'} or not all(is_offset(value) for value in position.values()):
+            raise InvalidCursor('Malformed cursor')
+    for key, value in state['f'].items():
+        if key not in FACET_FIELDS or not isinstance(value, str):
+            raise InvalidCursor('Malformed cursor')
+    return state
+
+
+def is_offset(value):
+    """Continuation offsets are non-negative ints, or None once a source is exhausted"""
+    return value is None or (type(value) is int and value >= 0)
+
+
+def timed_fetch(source, query, offset, limit, filters):
+    """fetch_source_page plus its wall time, measured on the worker thread"""
+    started = time.perf_counter()
+    try:
+        return ResourceService.fetch_source_page(source, query, offset, limit, filters), time.perf_counter() - started
+    except Exception as e:
+        e.elapsed = time.perf_counter() - started
+        raise
+
+
+def page_quotas(limit):
+    """How many hits each source contributes as ranking candidates for one page.
+
+    Remote quotas add up to ``limit`` while only ``limit - local`` remote hits
+    are served, so ranking always has some slack to choose from.
+    """
+    local = limit//4
+    vufind = min(5, limit//4)
+    rest = limit - vufind
+    return {
+        'koha': (rest + 1)//2,
+        'dspace': rest//2,
+        'vufind': vufind,
+        'local': local,
+    }
+
+
+class FederatedSearch:
+    """One page of a federated search, resumable through an opaque cursor.
+
+    The cursor records, per source, the continuation offset of the last hit
+    handed to the client (``c``) and of the last hit fetched (``o``, None once
+    the source is exhausted). Hits fetched beyond the page are cached under the
+    cursor's buffer id, so the next page only asks each source for what the
+    buffer cannot cover. If the buffer has expired the sources are re-read from
+    ``c`` instead. Ranking may serve a hit while an earlier one from the same
+    source is held back; ``c`` only advances over fully served prefixes, so an
+    expired buffer can repeat a few hits but never skips one.
+    """
+
+    def __init__(self, query='', filters=None, limit=20, cursor=None):
+        if cursor:
+            state = decode_cursor(cursor)
+            self.query = state.get('q', '')
+            self.filters = state['f']
+            self.limit = limit or state.get('l', 20)
+            self.positions = state['s']
+            buffer = cache.get(BUFFER_PREFIX + str(state.get('b')))
+            record_cache('search_buffer', buffer is not None)
+            buffer = buffer or {}
+        else:
+            self.query = query
+            self.filters = filters or {}
+            self.limit = limit
+            self.positions = {source: {'c': 0, 'o': 0} for source in REMOTE_SOURCES + ('local',)}
+            buffer = {}
+
+        self.quotas = page_quotas(self.limit)
+        self.buffer = {}
+        for source in REMOTE_SOURCES:
+            position = self.positions.get(source) or {'c': None, 'o': None}
+            self.positions[source] = position
+            if source in buffer:
+                self.buffer[source] = buffer[source]
+            else:
+                # Nothing buffered: whatever was fetched past ``c`` is re-read
+                self.buffer[source] = ([], [])
+                position['o'] = position['c']
+        self.futures = {}
+        self.local_results = []
+        self._scorer = None
+        self.started_at = time.perf_counter()
+        # source -> latency_ms, hits, timed_out, error, cache_hit for this page
+        self.timings = {}
+
+    @property
+    def scorer(self):
+        if self._scorer is None:
+            self._scorer = BM25Scorer(self.query)
+        return self._scorer
+
+    def wanted(self, source):
+        """Sources the filters rule out are never queried"""
+        return ResourceService.source_accepts(source, self.filters)
+
+    def start(self):
+        """Submit remote fetches for whatever each source's buffer cannot cover"""
+        for source in REMOTE_SOURCES:
+            offset = self.positions[source]['o']
+            missing = self.quotas[source] - len(self.buffer[source][0])
+            if not self.wanted(source) or not self.quotas[source]:
+                continue
+            if offset is None or missing <= 0:
+                # Served from the previous page's buffer without asking the source
+                if self.buffer[source][0]:
+                    self.timings[source] = {
+                        'latency_ms': 0.0, 'hits': len(self.buffer[source][0]),
+                        'timed_out': False, 'error': False, 'cache_hit': True
+                    }
+                continue
+            future = SEARCH_EXECUTOR.submit(timed_fetch, source, self.query, offset, missing, self.filters)
+            self.futures[future] = source
+        return self
+
+    def iter_remote(self):
+        """Yield (source, buffered hits) as each remote source answers"""
+        for future in as_completed(self.futures):
+            source = self.futures[future]
+            error = False
+            try:
+                (results, tokens, next_offset), elapsed = future.result()
+            except Exception as e:
+                print(f"{source} integration error: {e}")
+                results, tokens, next_offset = [], [], self.positions[source]['o']
+                error, elapsed = True, getattr(e, 'elapsed', 0.0)
+            self.timings[source] = {
+                'latency_ms': round(elapsed * 1000, 2), 'hits': len(results),
+                'timed_out': not results and elapsed >= SOURCE_TIMEOUT, 'error': error, 'cache_hit': False
+            }
+
+            # Filters the backend applied itself are not re-checked on the normalized hits
+            residual = ResourceService.residual_filters(source, self.filters)
+            kept = [(r, t) for r, t in zip(results, tokens) if ResourceService.result_matches(r, residual)]
+            buffered, buffered_tokens = self.buffer[source]
+            self.buffer[source] = (buffered + [r for r, _ in kept], buffered_tokens + [t for _, t in kept])
+            self.positions[source]['o'] = next_offset
+            yield source, self.buffer[source][0]
+
+        self.futures = {}
+
+    def fetch_local(self):
+        position = self.positions.get('local') or {'c': None}
+        self.positions['local'] = position
+        if position['c'] is None or not self.quotas['local']:
+            return []
+
+        started = time.perf_counter()
+        results, _, next_offset = ResourceService.fetch_local_page(
+            self.query, self.filters, position['c'], self.quotas['local']
+        )
+        position['c'] = next_offset
+        self.timings['local'] = {
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2), 'hits': len(results),
+            'timed_out': False, 'error': False, 'cache_hit': False
+        }
+
+        scorer = self.scorer
+        for result in results:
+            result.score = round(scorer.score(result), 4)
+        self.local_results = sorted(results, key=lambda result: result.score, reverse=True)
+        return self.local_results
+
+    def page(self):
+        """Collapse and rank the buffered hits, serve the best and return (results, next_cursor)"""
+        for _ in self.iter_remote():
+            pass
+
+        # Local hits are all served, so remote copies of them are used up with them
+        kept, duplicates = collapse_duplicates(
+            [hit for source in REMOTE_SOURCES for hit in self.buffer[source][0]], self.local_results
+        )
+        unique = {id(hit) for hit in kept}
+        candidates = {
+            source: [hit for hit in self.buffer[source][0] if id(hit) in unique]
+            for source in REMOTE_SOURCES
+        }
+        results, served = merge_top_k(candidates, self.limit - self.quotas['local'], self.scorer)
+        served |= {id(hit) for hit in self.local_results}
+        # A duplicate is used up together with the record it was folded into
+        served |= {hit_id for hit_id, owner in duplicates.items() if id(owner) in served}
+
+        leftovers = {}
+        for source in REMOTE_SOURCES:
+            buffered, tokens = self.buffer[source]
+            position = self.positions[source]
+            kept = [(hit, token) for hit, token in zip(buffered, tokens) if id(hit) not in served]
+            if not kept:
+                position['c'] = position['o']
+                continue
+
+            # Resume point after the served prefix, i.e. just before the first held-back hit
+            first = tokens.index(kept[0][1])
+            if first:
+                position['c'] = tokens[first - 1]
+            leftovers[source] = ([hit for hit, _ in kept], [token for _, token in kept])
+
+        return results, self.next_cursor(leftovers)
+
+    def elapsed_ms(self):
+        return round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    def next_cursor(self, leftovers):
+        done = [
+            self.positions[source]['c'] is None or not self.wanted(source) or not self.quotas[source]
+            for source in REMOTE_SOURCES
+        ]
+        done.append(self.positions['local']['c'] is None or not self.quotas['local'])
+        exhausted = all(done)
+        if exhausted and not leftovers:
+            return None
+
+        buffer_id = uuid.uuid4().hex
+        if leftovers:
+            cache.set(BUFFER_PREFIX + buffer_id, leftovers, BUFFER_TIMEOUT)
+
+        return encode_cursor({
+            'v': CURSOR_VERSION,
+            'q': self.query,
+            'f': self.filters,
+            'l': self.limit,
+            's': self.positions,
+            'b': buffer_id,
+        })
@@ -0,0 +1,182 @@
+import re
+import unicodedata
+import uuid
+from django.db.models import Q
+from .models import WorkIdentifier
+
+HANDLE_URL_PATTERN = re.compile(r'/handle/(\d+/\d+)')
+ISBN_PATTERN = re.compile(r'[0-9Xx][0-9Xx\- ]{8,16}[0-9Xx]')
+NON_WORD_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+LEADING_ARTICLES = ('the ', 'a ', 'an ')
+YEAR_PATTERN = re.compile(r'\d{4}')
+
+# Scheme of each system's own record id
+SOURCE_SCHEMES = {'koha': 'koha_biblio', 'dspace': 'dspace_uuid', 'vufind': 'vufind_id'}
+
+
+def normalize_isbn(value):
+    """ISBN-13 digits for an ISBN-10 or ISBN-13 string, or '' if it is not one"""
+    match = ISBN_PATTERN.search(str(value or ''))
+    if not match:
+        return ''
+    digits = re.sub(r'[^0-9X]', '', match.group().upper())
+    if len(digits) == 10:
+        core = '978' + digits[:9]
+        check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(core)) % 10) % 10
+        return core + str(check)
+    return digits if len(digits) == 13 and digits.isdigit() else ''
+
+
+def normalize_issn(value):
+    digits = re.sub(r'[^0-9X]', '', str(value or '').upper())
+    return f"{digits[:4]}-{digits[4:]}" if len(digits) == 8 else ''
+
+
+def title_year_key(title, year):
+    """Accent-, case- and punctuation-insensitive title plus publication year.
+
+    Titles without a year are not keyed; "Introduction" alone is not a work.
+    """
+    year_match = YEAR_PATTERN.search(str(year or ''))
+    if not year_match:
+        return ''
+    text = unicodedata.normalize('NFKD', str(title or '')).encode('ascii', 'ignore').decode().lower()
+    text = NON_WORD_PATTERN.sub(' ', text).strip()
+    for article in LEADING_ARTICLES:
+        if text.startswith(article):
+            text = text[len(article):]
+            break
+    if not text:
+        return ''
+    return f"{text[:240]}|{year_match.group()}"
+
+
+def handle_from_url(url):
+    match = HANDLE_URL_PATTERN.search(str(url or ''))
+    return match.group(1) if match else ''
+
+
+def result_identifiers(result):
+    """(scheme, value) pairs a normalized SearchResult can be resolved by"""
+    identifiers = []
+    source = result.source
+    external_id = str(result.external_id or '')
+
+    if source == 'koha':
+        identifiers.append(('koha_biblio', external_id))
+    elif source == 'dspace':
+        result_id = str(result.id)
+        dspace_uuid = result_id[len('dspace_'):] if result_id.startswith('dspace_') else external_id
+        identifiers.append(('dspace_uuid', dspace_uuid))
+        if external_id and external_id != dspace_uuid:
+            identifiers.append(('dspace_handle', external_id))
+    elif source == 'vufind':
+        identifiers.append(('vufind_id', external_id))
+
+    handle = handle_from_url(result.url)
+    if handle:
+        identifiers.append(('dspace_handle', handle))
+
+    key = title_year_key(result.title, result.year)
+    if key:
+        identifiers.append(('title_year', key))
+    return [(scheme, value) for scheme, value in identifiers if value]
+
+
+def resolve_works(identifiers):
+    """Map (scheme, value) -> work key for every identifier already in the index, in one query"""
+    by_scheme = {}
+    for scheme, value in identifiers:
+        by_scheme.setdefault(scheme, set()).add(value)
+    if not by_scheme:
+        return {}
+
+    query = Q()
+    for scheme, values in by_scheme.items():
+        query |= Q(scheme=scheme, value__in=values)
+    return {
+        (scheme, value): work
+        for scheme, value, work in WorkIdentifier.objects.filter(query).values_list('scheme', 'value', 'work')
+    }
+
+
+def register_works(groups):
+    """Record that each group of identifiers names one work.
+
+    ``groups`` is a list of (identifiers, resource or None). A group joins the
+    work any of its identifiers already belongs to; if it spans several known
+    works they are merged into the first. Returns the work key of each group.
+    """
+    groups = [([(s, str(v)[:255]) for s, v in identifiers if v], resource) for identifiers, resource in groups]
+    known = resolve_works(pair for identifiers, _ in groups for pair in identifiers)
+
+    work_keys, merges, new = [], {}, {}
+    for identifiers, resource in groups:
+        works = list(dict.fromkeys(known[pair] for pair in identifiers if pair in known))
+        work = works[0] if works else uuid.uuid4().hex
+        for other in works[1:]:
+            merges[other] = work
+        for pair in identifiers:
+            if pair not in known:
+                known[pair] = work
+                new[pair] = WorkIdentifier(scheme=pair[0], value=pair[1], work=work, resource=resource)
+        work_keys.append(work)
+
+    for old, work in merges.items():
+        WorkIdentifier.objects.filter(work=old).update(work=work)
+    if new:
+        WorkIdentifier.objects.bulk_create(new.values(), ignore_conflicts=True)
+    return [merges.get(work, work) for work in work_keys]
+
+
+def register_work(identifiers, resource=None):
+    return register_works([(identifiers, resource)])[0]
+
+
+def link(result):
+    return {'id': result.id, 'source': result.source, 'source_name': result.source_name, 'url': result.url}
+
+
+def collapse_duplicates(results, local=()):
+    """Fold hits that name the same work into the first of them.
+
+    Hits are keyed by their resolved work, falling back to the raw identifiers
+    (so an unregistered title+year still matches across sources), and each key
+    is a dict lookup, so the pass is O(n) after the resolution queries.
+    ``local`` hits are rows of the local index; they come first, so they are
+    always kept, and are also matched by the work their Resource is linked to.
+    Every kept hit gets ``links`` listing itself and its duplicates. Returns
+    the kept hits and a map of id(duplicate) -> the hit it was folded into.
+    """
+    local = list(local)
+    hits = local + list(results)
+    identifiers = [result_identifiers(result) for result in hits]
+    works = resolve_works(pair for pairs in identifiers for pair in pairs)
+    resource_works = dict(
+        WorkIdentifier.objects.filter(resource_id__in=[result.id for result in local]).values_list('resource_id', 'work')
+    ) if local else {}
+
+    owners, origins, kept, duplicates = {}, {}, [], {}
+    for index, (result, pairs) in enumerate(zip(hits, identifiers)):
+        keys = [works.get(pair, pair) for pair in pairs]
+        origin = result.source
+        if index < len(local):
+            origin = 'local'
+            if result.id in resource_works:
+                keys.append(resource_works[result.id])
+        owner = next((owners[key] for key in keys if key in owners), None)
+
+        if owner is None or origins[id(owner)] == origin:
+            # Distinct records from one source (or two local rows) are never folded together
+            result.links = [link(result)]
+            kept.append(result)
+            owner = result
+            origins[id(owner)] = origin
+        else:
+            owner.links.append(link(result))
+            duplicates[id(result)] = owner
+
+        for key in keys:
+            owners.setdefault(key, owner)
+
+    return kept, duplicates
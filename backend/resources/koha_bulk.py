@@ -0,0 +1,189 @@
+import csv
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.db import connection
+from django.db.models import Count
+from .koha_rest_api import KohaRestAPI
+from .models import KohaCatalogEntry
+from .services import ResourceService
+
+# Finished rows are written in batches from the coordinating thread; a new biblio id is written at once
+JOURNAL_FLUSH_SIZE = 50
+
+
+def detect_format(filename):
+    """Guess input format from the file extension"""
+    return 'csv' if filename.lower().endswith('.csv') else 'jsonl'
+
+
+def read_rows(stream, fmt='jsonl'):
+    """Yield one metadata dict per input row (None for rows that cannot be parsed)"""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        return
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+class KohaBulkCataloguer:
+    """Catalogue many records in Koha with bounded concurrency and a resumable journal.
+
+    Rows use the same field names as the upload form (title, authors, abstract,
+    date_year, subject_keywords, publisher, ...) plus an optional dspace_url.
+    Every row ends up in KohaCatalogEntry keyed by (job, row_number); running the
+    same job again skips finished rows and only re-adds the item for any row that
+    already has a biblio, whatever went wrong after it was created.
+    """
+
+    def __init__(self, job, workers=8, koha_api=None):
+        self.job = job
+        self.workers = max(1, int(workers))
+        self.koha_api = koha_api or KohaRestAPI()
+        self._pending = []
+        # One journal writer at a time; SQLite would otherwise make concurrent writers fail
+        self._journal_lock = threading.Lock()
+
+    def run(self, rows, progress=None):
+        if not self.koha_api.authenticate():
+            raise Exception("Koha authentication failed")
+
+        previous = {
+            row_number: (status, biblio_id)
+            for row_number, status, biblio_id in KohaCatalogEntry.objects.filter(
+                job=self.job
+            ).values_list('row_number', 'status', 'biblio_id')
+        }
+        summary = {'done': 0, 'item_failed': 0, 'failed': 0, 'skipped': 0}
+
+        # Keep only a small window of rows in flight so memory stays flat for large files
+        max_in_flight = self.workers * 4
+        in_flight = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for row_number, row in enumerate(rows, start=1):
+                status, biblio_id = previous.get(row_number, (None, ''))
+                if status == 'done':
+                    summary['skipped'] += 1
+                    continue
+
+                # A journaled biblio id means the biblio exists in Koha; never create it twice
+                in_flight.add(executor.submit(self._catalog_row, row_number, row, biblio_id or ''))
+
+                if len(in_flight) >= max_in_flight:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(finished, summary, progress)
+
+            finished, _ = wait(in_flight)
+            self._collect(finished, summary, progress)
+
+        self._flush()
+        return summary
+
+    def _catalog_row(self, row_number, row, biblio_id=''):
+        entry = KohaCatalogEntry(job=self.job, row_number=row_number)
+
+        if row is None:
+            entry.status = 'failed'
+            entry.error = 'Row could not be parsed'
+            return entry
+
+        entry.title = str(row.get('title', ''))[:500]
+        if not entry.title:
+            entry.status = 'failed'
+            entry.error = 'title is required'
+            return entry
+
+        try:
+            dspace_url = row.get('dspace_url', '')
+
+            if not biblio_id:
+                marc_record = self.koha_api._convert_to_marc(ResourceService.koha_metadata(row, dspace_url))
+                biblio = self.koha_api.submit_biblio(marc_record)
+                if not biblio:
+                    entry.status = 'failed'
+                    entry.error = 'Failed to create Koha bibliographic record'
+                    return entry
+                biblio_id = biblio.get('id')
+                entry.biblio_id = str(biblio_id)
+                self._journal_biblio(entry)
+            entry.biblio_id = str(biblio_id)
+
+            item = self.koha_api.add_item(biblio_id, ResourceService.koha_item_data(biblio_id, row, dspace_url))
+            if item:
+                entry.status = 'done'
+            else:
+                entry.status = 'item_failed'
+                entry.error = 'Failed to add Koha item'
+        except Exception as e:
+            entry.status = 'failed'
+            entry.error = str(e)
+
+        return entry
+
+    def _journal_biblio(self, entry):
+        """Record a new biblio before its item is added, so a crash here never leads to a second biblio"""
+        try:
+            with self._journal_lock:
+                KohaCatalogEntry.objects.update_or_create(
+                    job=self.job, row_number=entry.row_number,
+                    defaults={
+                        'title': entry.title, 'status': 'item_failed', 'biblio_id': entry.biblio_id,
+                        'error': 'Item not added yet'
+                    }
+                )
+        finally:
+            # Runs on a pool thread; do not leave its connection open
+            connection.close()
+
+    def _collect(self, futures, summary, progress):
+        for future in futures:
+            entry = future.result()
+            summary[entry.status] += 1
+            self._pending.append(entry)
+            if progress:
+                progress(entry)
+
+        if len(self._pending) >= JOURNAL_FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        with self._journal_lock:
+            KohaCatalogEntry.objects.bulk_create(
+                self._pending,
+                update_conflicts=True,
+                unique_fields=['job', 'row_number'],
+                update_fields=['title', 'status', 'biblio_id', 'error', 'updated_at']
+            )
+        self._pending = []
+
+
+def job_summary(job):
+    """Per-status counts and the first failures recorded for a job"""
+    entries = KohaCatalogEntry.objects.filter(job=job)
+    counts = {'done': 0, 'item_failed': 0, 'failed': 0}
+    for row in entries.values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+
+    failures = entries.exclude(status='done').order_by('row_number').values(
+        'row_number', 'title', 'status', 'biblio_id', 'error'
+    )[:50]
+
+    return {
+        'job': job,
+        'counts': counts,
+        'total': sum(counts.values()),
+        'failures': list(failures)
+    }
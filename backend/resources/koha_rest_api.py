@@ -35,13 +35,49 @@ class KohaRestAPI:
             "Accept": "application/json"
         }
     
-    def search_biblios(self, query, limit=20):
-        """Get all bibliographic records"""
+    def search_biblios(self, query, limit=20, page=1, filters=None):
+        """One page of ``limit`` bibliographic records matching ``query``
+        
+        Both are sent as a Koha ``q`` query: the text as a substring match on
+        title, author or notes, and a ``year`` filter on copyright_date.
+        """
         if not self.token and not self.authenticate():
             return []
         
         try:
-            params = {"_per_page": limit}
+            params = {"_per_page": limit, "_page": page}
+            conditions = {}
+            if query:
+                # LIKE wildcards typed by the user are matched literally
+                pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                conditions["-or"] = [{field: {"-like": pattern}} for field in ("title", "author", "notes")]
+            if filters and filters.get('year'):
+                conditions["copyright_date"] = int(filters['year'])
+            if conditions:
+                params["q"] = json.dumps(conditions)
+            response = requests.get(f"{self.base_url}/biblios", 
+                                  headers=self._get_headers(),
+                                  params=params)
+            
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except:
+            return []
+    
+    def get_biblios(self, biblio_ids):
+        """Get several bibliographic records in one request"""
+        if not biblio_ids:
+            return []
+        if not self.token and not self.authenticate():
+            return []
+        
+        try:
+            params = {
+                "_per_page": len(biblio_ids),
+                # A list value is an IN (...) condition in Koha's query language
+                "q": json.dumps({"biblio_id": [int(biblio_id) for biblio_id in biblio_ids]})
+            }
             response = requests.get(f"{self.base_url}/biblios", 
                                   headers=self._get_headers(),
                                   params=params)
@@ -75,7 +111,18 @@ class KohaRestAPI:
         try:
             # Convert metadata to MARC format
             marc_record = self._convert_to_marc(metadata)
-            
+        except Exception as e:
+            print(f"Create biblio error: {e}")
+            return None
+        
+        return self.submit_biblio(marc_record)
+    
+    def submit_biblio(self, marc_record):
+        """Create bibliographic record from an already built MARC-in-JSON record"""
+        if not self.token and not self.authenticate():
+            return None
+        
+        try:
             response = requests.post(f"{self.base_url}/biblios", 
                                    headers=self._get_headers("application/marc-in-json"),
                                    json=marc_record)
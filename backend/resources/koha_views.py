@@ -1,7 +1,13 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
+from django.db import connection
 from .koha_rest_api import KohaRestAPI
+from .koha_bulk import KohaBulkCataloguer, detect_format, read_rows, job_summary
+import os
+import threading
+import uuid
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -52,4 +58,63 @@ def create_biblio(request):
         }, status=201)
         
     except Exception as e:
-        return Response({'error': f'Creation failed: {str(e)}'}, status=500)
\ No newline at end of file
+        return Response({'error': f'Creation failed: {str(e)}'}, status=500)
+
+def _run_bulk_catalog(job, path, fmt, workers):
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            summary = KohaBulkCataloguer(job, workers=workers).run(read_rows(stream, fmt))
+        print(f"✅ Koha bulk catalog job {job} finished: {summary}")
+    except Exception as e:
+        print(f"❌ Koha bulk catalog job {job} failed: {e}")
+    finally:
+        connection.close()
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_catalog(request):
+    """Start a bulk cataloguing job from an uploaded JSON Lines or CSV file"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'error': 'file is required'}, status=400)
+    
+    # Re-using a job id resumes it: finished rows are skipped
+    job = request.data.get('job') or uuid.uuid4().hex[:12]
+    if not job.replace('-', '').replace('_', '').isalnum():
+        return Response({'error': 'job may only contain letters, digits, "-" and "_"'}, status=400)
+    
+    fmt = request.data.get('format') or detect_format(upload.name)
+    if fmt not in ('csv', 'jsonl'):
+        return Response({'error': 'format must be csv or jsonl'}, status=400)
+    
+    try:
+        workers = min(int(request.data.get('workers', 8)), 32)
+    except ValueError:
+        return Response({'error': 'workers must be a number'}, status=400)
+    
+    job_dir = os.path.join(settings.MEDIA_ROOT, 'koha_bulk')
+    os.makedirs(job_dir, exist_ok=True)
+    path = os.path.join(job_dir, f"{job}.{fmt}")
+    with open(path, 'wb') as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    
+    threading.Thread(target=_run_bulk_catalog, args=(job, path, fmt, workers), daemon=True).start()
+    
+    return Response({
+        'message': 'Bulk cataloguing started',
+        'job': job,
+        'status_url': f"/api/koha/bulk-catalog/{job}/"
+    }, status=202)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bulk_catalog_status(request, job):
+    """Progress of a bulk cataloguing job"""
+    if not request.user.is_staff:
+        return Response({'error': 'Admin access required'}, status=403)
+    
+    return Response(job_summary(job))
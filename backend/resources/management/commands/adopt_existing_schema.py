@@ -0,0 +1,60 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, migrations
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+# Apps whose tables existed (built by syncdb) before they had migrations
+ADOPTED_APPS = ('authentication', 'resources')
+
+
+class Command(BaseCommand):
+    help = 'Record the migrations of a syncdb-built database as applied where their tables and indexes already exist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the migrations that would be recorded')
+
+    def handle(self, *args, **options):
+        # Loading does not check history consistency, so this runs where migrate refuses to
+        loader = MigrationLoader(connection)
+        recorder = MigrationRecorder(connection)
+        tables = set(connection.introspection.table_names())
+        verb = 'Would record' if options['dry_run'] else 'Recorded'
+        adopted = 0
+
+        for app in ADOPTED_APPS:
+            for key in loader.graph.forwards_plan(loader.graph.leaf_nodes(app)[0]):
+                if key[0] != app or key in recorder.applied_migrations():
+                    continue
+                if self.already_applied(app, loader.graph.nodes[key], tables):
+                    if not options['dry_run']:
+                        recorder.record_applied(*key)
+                    self.stdout.write(self.style.SUCCESS(f"{verb} {app}.{key[1]}"))
+                    adopted += 1
+                elif options['dry_run']:
+                    self.stdout.write(f"Would migrate {app}.{key[1]}")
+                else:
+                    # Run it now, so a later migration whose tables syncdb already made can still be recorded
+                    call_command('migrate', app, key[1], verbosity=0)
+                    self.stdout.write(f"Migrated {app}.{key[1]}")
+
+        if not adopted:
+            self.stdout.write('Nothing to adopt')
+
+    @staticmethod
+    def already_applied(app, migration, tables):
+        for operation in migration.operations:
+            if isinstance(operation, migrations.CreateModel):
+                table = operation.options.get('db_table') or f"{app}_{operation.name_lower}"
+                if table not in tables:
+                    return False
+            elif isinstance(operation, migrations.AddIndex):
+                table = f"{app}_{operation.model_name_lower}"
+                if table not in tables:
+                    return False
+                with connection.cursor() as cursor:
+                    if operation.index.name not in connection.introspection.get_constraints(cursor, table):
+                        return False
+            else:
+                return False
+        return True
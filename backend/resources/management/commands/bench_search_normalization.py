@@ -0,0 +1,164 @@
+from django.core.management.base import BaseCommand
+from resources.projection import project_koha, project_dspace, project_vufind
+import gc
+import time
+import tracemalloc
+
+
+def legacy_koha(item):
+    return {
+        'id': f"koha_{item.get('biblio_id', '')}",
+        'title': item.get('title', 'No Title'),
+        'authors': item.get('author', ''),
+        'source': 'koha',
+        'source_name': 'Library Catalog',
+        'external_id': str(item.get('biblio_id', '')),
+        'resource_type': 'book',
+        'year': item.get('copyright_date', ''),
+        'description': item.get('abstract', ''),
+        'url': f"http://127.0.0.1:8085/cgi-bin/koha/catalogue/detail.pl?biblionumber={item.get('biblio_id', '')}",
+        'availability': 'Available'
+    }
+
+
+def legacy_dspace(item):
+    obj = item.get('_embedded', {}).get('indexableObject', {})
+    metadata = obj.get('metadata', {})
+
+    authors = []
+    for author_field in ['dc.contributor.author', 'dc.creator']:
+        if author_field in metadata:
+            authors.extend([m.get('value', '') for m in metadata[author_field]])
+
+    description = ''
+    for desc_field in ['dc.description.abstract', 'dc.description']:
+        if desc_field in metadata and metadata[desc_field]:
+            description = metadata[desc_field][0].get('value', '')
+            break
+
+    year = ''
+    for date_field in ['dc.date.issued', 'dc.date.created']:
+        if date_field in metadata and metadata[date_field]:
+            year_value = metadata[date_field][0].get('value', '')
+            if year_value:
+                year = year_value[:4] if len(year_value) >= 4 else year_value
+            break
+
+    handle = obj.get('handle', '')
+    uuid = obj.get('uuid', '')
+    dspace_url = f"http://localhost:4000/handle/{handle}" if handle else f"http://localhost:4000/items/{uuid}"
+
+    return {
+        'id': f"dspace_{uuid}",
+        'title': obj.get('name', ''),
+        'authors': ', '.join(authors),
+        'source': 'dspace',
+        'source_name': 'Research Repository',
+        'external_id': handle or uuid,
+        'resource_type': obj.get('type', 'document'),
+        'year': year,
+        'description': description,
+        'url': dspace_url,
+        'availability': 'Open Access'
+    }
+
+
+def legacy_vufind(item):
+    return {
+        'id': f"vufind_{item.get('id', '')}",
+        'title': item.get('title', ''),
+        'authors': ', '.join(item.get('author', [])) if isinstance(item.get('author'), list) else item.get('author', ''),
+        'source': 'vufind',
+        'source_name': 'Discovery Layer',
+        'external_id': item.get('id', ''),
+        'resource_type': item.get('format', ['Unknown'])[0] if isinstance(item.get('format'), list) else item.get('format', 'Unknown'),
+        'year': item.get('publishDate', [''])[0] if isinstance(item.get('publishDate'), list) else item.get('publishDate', ''),
+        'description': item.get('summary', [''])[0] if isinstance(item.get('summary'), list) else item.get('summary', ''),
+        'url': f"http://localhost:8090/Record/{item.get('id', '')}",
+        'availability': 'Check Availability'
+    }
+
+
+def sample_hits(count):
+    koha, dspace, vufind = [], [], []
+    for i in range(count):
+        koha.append({
+            'biblio_id': i,
+            'title': f'Koha title {i}',
+            'author': 'Kebede, Abebe',
+            'copyright_date': 2000 + i % 25,
+            'abstract': 'A catalogue record abstract ' * 4
+        })
+        dspace.append({'_embedded': {'indexableObject': {
+            'uuid': f'0000-{i:08d}',
+            'handle': f'123456789/{i}',
+            'name': f'DSpace item {i}',
+            'type': 'item',
+            'metadata': {
+                'dc.contributor.author': [{'value': 'Mohammed, Sara'}, {'value': 'Tesfaye, Dawit'}],
+                'dc.description.abstract': [{'value': 'Repository abstract ' * 6}],
+                'dc.date.issued': [{'value': f'{2000 + i % 25}-05-01'}],
+                'dc.title': [{'value': f'DSpace item {i}'}]
+            }
+        }}})
+        vufind.append({
+            'id': f'vf{i}',
+            'title': f'VuFind record {i}',
+            'author': ['Alemu, Hana'],
+            'format': ['Book'],
+            'publishDate': [str(2000 + i % 25)],
+            'summary': ['Discovery summary']
+        })
+    return {'koha': koha, 'dspace': dspace, 'vufind': vufind}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark search hit normalization: legacy dict building vs slotted projections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=10000, help='Hits per source')
+        parser.add_argument('--repeat', type=int, default=5, help='Best of N runs')
+
+    def handle(self, *args, **options):
+        records = options['records']
+        hits = sample_hits(records)
+        pairs = {
+            'koha': (legacy_koha, project_koha),
+            'dspace': (legacy_dspace, project_dspace),
+            'vufind': (legacy_vufind, project_vufind),
+        }
+
+        self.stdout.write(f'{records} hits per source, best of {options["repeat"]} runs, per 10k records')
+        scale = 10000 / records
+        for source, (legacy, projection) in pairs.items():
+            items = hits[source]
+            before, after = self._best_pair(
+                lambda: list(map(legacy, items)), lambda: list(map(projection, items)), options['repeat']
+            )
+            before_kb = self._allocated(lambda: list(map(legacy, items)))
+            after_kb = self._allocated(lambda: list(map(projection, items)))
+            self.stdout.write(
+                f'{source:>7}: legacy {before * scale * 1000:7.2f} ms {before_kb * scale:8.0f} KB | '
+                f'projection {after * scale * 1000:7.2f} ms {after_kb * scale:8.0f} KB | '
+                f'speedup {before / after:4.2f}x'
+            )
+
+    def _allocated(self, func):
+        """KB retained by the normalized results (excluding the raw hits)"""
+        tracemalloc.start()
+        results = func()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del results
+        return current / 1024
+
+    def _best_pair(self, first, second, repeat):
+        """Best time of each function, alternating runs so machine noise hits both alike"""
+        timings = ([], [])
+        for _ in range(max(1, repeat)):
+            for func, runs in ((first, timings[0]), (second, timings[1])):
+                gc.collect()
+                start = time.perf_counter()
+                func()
+                runs.append(time.perf_counter() - start)
+        return min(timings[0]), min(timings[1])
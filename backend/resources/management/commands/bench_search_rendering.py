@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer
+from resources.projection import project_koha, project_dspace, project_vufind
+from resources.renderers import JSONRenderer, orjson
+from .bench_search_normalization import sample_hits
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# (label, hits per remote source, description repeat factor)
+SCENARIOS = [
+    ('typical (limit=20)', 7, 1),
+    ('worst case (limit=500, long abstracts)', 170, 40),
+]
+
+
+def build_results(per_source, description_factor):
+    hits = sample_hits(per_source)
+    results = (
+        list(map(project_koha, hits['koha']))
+        + list(map(project_dspace, hits['dspace']))
+        + list(map(project_vufind, hits['vufind']))
+    )
+    for result in results:
+        result.description = (result.description or 'Summary text. ') * description_factor
+    return results
+
+
+def legacy_payload(results):
+    """Response shape before SearchResult: hits copied into results and grouped"""
+    dicts = [r.to_dict() for r in results]
+    grouped = {'koha': [], 'dspace': [], 'vufind': [], 'local': []}
+    for item in dicts:
+        grouped[item['source']].append(item)
+    return {'results': dicts, 'grouped': grouped, 'total': len(dicts), 'query': '', 'filters': {}}
+
+
+def current_payload(results):
+    groups = {'koha': [], 'dspace': [], 'vufind': [], 'local': []}
+    for index, result in enumerate(results):
+        groups[result.source].append(index)
+    return {'results': results, 'groups': groups, 'total': len(results), 'query': '', 'filters': {}}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark search response rendering time and bytes on the wire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Best of N renders')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        self.stdout.write(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}, brotli: {'yes' if brotli else 'no'}")
+
+        for label, per_source, factor in SCENARIOS:
+            results = build_results(per_source, factor)
+            self.stdout.write(f'\n{label}: {len(results)} hits')
+
+            legacy = legacy_payload(results)
+            legacy_body = StdlibJSONRenderer().render(legacy)
+            legacy_ms = self._best(lambda: StdlibJSONRenderer().render(legacy_payload(results)), repeat)
+            self._report('before: stdlib, results+grouped', legacy_ms, legacy_body)
+
+            current = current_payload(results)
+            body = JSONRenderer().render(current)
+            current_ms = self._best(lambda: JSONRenderer().render(current_payload(results)), repeat)
+            self._report('after:  fast renderer, groups', current_ms, body)
+
+    def _report(self, label, ms, body):
+        gzip_size = len(compress_string(body))
+        line = f'  {label:<34} {ms:8.3f} ms  raw {len(body):>9,} B  gzip {gzip_size:>8,} B'
+        if brotli is not None:
+            line += f'  br {len(brotli.compress(body, quality=5)):>8,} B'
+        self.stdout.write(line)
+
+    def _best(self, func, repeat):
+        timings = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from resources.koha_bulk import KohaBulkCataloguer, detect_format, read_rows
+import os
+
+
+class Command(BaseCommand):
+    help = 'Catalogue records from a JSON Lines or CSV file in Koha (resumable per job)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON Lines or CSV file with one record per row')
+        parser.add_argument('--job', help='Journal key; re-running a job skips finished rows (default: file name)')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Input format (default: from extension)')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent Koha requests')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File does not exist: {path}')
+
+        job = options['job'] or os.path.splitext(os.path.basename(path))[0]
+        fmt = options['format'] or detect_format(path)
+        processed = [0]
+
+        def progress(entry):
+            processed[0] += 1
+            if entry.status != 'done':
+                self.stdout.write(self.style.WARNING(f'Row {entry.row_number}: {entry.status} - {entry.error}'))
+            if processed[0] % 1000 == 0:
+                self.stdout.write(f'{processed[0]} rows processed')
+
+        cataloguer = KohaBulkCataloguer(job, workers=options['workers'])
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                summary = cataloguer.run(read_rows(stream, fmt), progress=progress)
+        except Exception as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Job {job}: {summary['done']} done, {summary['item_failed']} item failures, "
+            f"{summary['failed']} failed, {summary['skipped']} already done"
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from resources.marc_import import detect_format, import_records, iter_iso2709, iter_marcxml, open_marc_file
+import os
+
+
+class Command(BaseCommand):
+    help = 'Stream an ISO 2709 or MARCXML export (optionally .gz) into the local Resource index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='MARC export file (.mrc, .xml, optionally gzipped)')
+        parser.add_argument('--format', choices=['iso2709', 'marcxml'], help='Input format (default: from extension)')
+        parser.add_argument('--source', default='koha', help='Resource.source for imported records')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Records per upsert')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File does not exist: {path}')
+
+        fmt = options['format'] or detect_format(path)
+        reader = iter_marcxml if fmt == 'marcxml' else iter_iso2709
+
+        def progress(stats):
+            self.stdout.write(f"{stats['imported']} records imported")
+
+        try:
+            with open_marc_file(path) as stream:
+                stats = import_records(
+                    reader(stream),
+                    source=options['source'],
+                    batch_size=options['batch_size'],
+                    progress=progress
+                )
+        except Exception as e:
+            raise CommandError(f'Import failed: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} records ({stats['skipped']} skipped without title or id)"
+        ))
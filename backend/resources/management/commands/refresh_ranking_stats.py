@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from resources.ranking import refresh_term_frequencies
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recount the whole-token document frequencies and corpus statistics used by BM25 ranking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=int, metavar='SECONDS', help='Keep running, refreshing every SECONDS')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = refresh_term_frequencies()
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats['documents']} documents, average length {stats['avg_length']:.1f} characters"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,225 @@
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from .caching import bump_version
+from .identifiers import SOURCE_SCHEMES, register_works, normalize_isbn, normalize_issn, title_year_key, handle_from_url
+from .models import Resource
+
+MARC_NS = '{http://www.loc.gov/MARC21/slim}'
+
+FIELD_TERMINATOR = b'\x1e'
+RECORD_TERMINATOR = b'\x1d'
+SUBFIELD_DELIMITER = '\x1f'
+
+RESOURCE_TYPES = {code for code, _ in Resource.TYPE_CHOICES}
+UPDATE_FIELDS = [
+    'title', 'authors', 'description', 'resource_type', 'year',
+    'publisher', 'view_url', 'metadata', 'updated_at'
+]
+
+YEAR_PATTERN = re.compile(r'\d{4}')
+
+
+def open_marc_file(path):
+    """Open a MARC export in binary mode, transparently handling .gz files"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'marcxml' if name.lower().endswith('.xml') else 'iso2709'
+
+
+def marcxml_record(elem):
+    """Turn a MARCXML <record> element into {tag: [value or {code: [values]}]}"""
+    record = {}
+    for field in elem:
+        tag = field.get('tag')
+        if not tag:
+            continue
+        if field.tag.endswith('controlfield'):
+            record.setdefault(tag, []).append(field.text or '')
+        elif field.tag.endswith('datafield'):
+            subfields = {}
+            for subfield in field:
+                subfields.setdefault(subfield.get('code'), []).append(subfield.text or '')
+            record.setdefault(tag, []).append(subfields)
+    return record
+
+
+def iter_marcxml(stream):
+    """Yield records from a MARCXML file one at a time, clearing parsed elements"""
+    root = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if root is None:
+            root = elem
+            continue
+        if event == 'end' and elem.tag in (f'{MARC_NS}record', 'record'):
+            yield marcxml_record(elem)
+            # Drop everything parsed so far so memory stays flat
+            elem.clear()
+            root.clear()
+
+
+def iso2709_record(data):
+    """Decode one ISO 2709 record (without its record terminator)"""
+    leader = data[:24].decode('ascii', errors='replace')
+    encoding = 'utf-8' if leader[9:10] == 'a' else 'latin-1'
+    base_address = int(leader[12:17])
+    directory = data[24:base_address - 1]
+
+    record = {}
+    for start in range(0, len(directory) - 11, 12):
+        entry = directory[start:start + 12].decode('ascii', errors='replace')
+        tag = entry[:3]
+        length = int(entry[3:7])
+        offset = int(entry[7:12])
+        raw = data[base_address + offset:base_address + offset + length].rstrip(FIELD_TERMINATOR)
+        value = raw.decode(encoding, errors='replace')
+
+        if tag < '010' and tag.isdigit():
+            record.setdefault(tag, []).append(value)
+            continue
+
+        subfields = {}
+        for chunk in value.split(SUBFIELD_DELIMITER)[1:]:
+            if chunk:
+                subfields.setdefault(chunk[0], []).append(chunk[1:])
+        record.setdefault(tag, []).append(subfields)
+    return record
+
+
+def iter_iso2709(stream):
+    """Yield records from an ISO 2709 file, reading one record length at a time"""
+    while True:
+        head = stream.read(5)
+        if not head.strip():
+            return
+        try:
+            length = int(head)
+        except ValueError:
+            raise ValueError(f'Invalid ISO 2709 record length: {head!r}')
+        data = head + stream.read(length - 5)
+        yield iso2709_record(data.rstrip(RECORD_TERMINATOR))
+
+
+def first_subfield(record, tag, code):
+    for field in record.get(tag, []):
+        if isinstance(field, dict) and field.get(code):
+            return field[code][0].strip()
+    return ''
+
+
+def all_subfields(record, tag, code):
+    values = []
+    for field in record.get(tag, []):
+        if isinstance(field, dict):
+            values.extend(v.strip() for v in field.get(code, []) if v.strip())
+    return values
+
+
+def clean_heading(value):
+    """Strip trailing ISBD punctuation ("Title /", "Publisher,")"""
+    return value.rstrip(' /:;,.=').strip()
+
+
+def record_identifier(record):
+    """Koha biblionumber (999$c), falling back to the control number (001)"""
+    biblionumber = first_subfield(record, '999', 'c')
+    if biblionumber:
+        return biblionumber
+    control_numbers = record.get('001', [])
+    return control_numbers[0].strip() if control_numbers else ''
+
+
+def record_to_resource_fields(record):
+    """Reverse of KohaRestAPI._convert_to_marc: map MARC fields onto Resource fields"""
+    title = clean_heading(first_subfield(record, '245', 'a'))
+    subtitle = clean_heading(first_subfield(record, '245', 'b'))
+    if subtitle:
+        title = f"{title}: {subtitle}"
+
+    authors = [clean_heading(a) for a in all_subfields(record, '100', 'a') + all_subfields(record, '700', 'a')]
+
+    publisher = first_subfield(record, '260', 'b') or first_subfield(record, '264', 'b')
+    date = first_subfield(record, '260', 'c') or first_subfield(record, '264', 'c')
+    year_match = YEAR_PATTERN.search(date)
+
+    resource_type = first_subfield(record, '655', 'a').lower()
+    if resource_type not in RESOURCE_TYPES:
+        resource_type = 'book'
+
+    view_url = first_subfield(record, '856', 'u')
+    subjects = [clean_heading(s) for s in all_subfields(record, '650', 'a')]
+
+    metadata = {'subjects': subjects, 'subject_keywords': ', '.join(subjects)}
+    for key, tag in (('series', '490'), ('issn', '022'), ('language', '041')):
+        value = first_subfield(record, tag, 'a')
+        if value:
+            metadata[key] = value
+
+    return {
+        'title': title[:500],
+        'authors': ', '.join(authors)[:500],
+        'description': first_subfield(record, '520', 'a'),
+        'resource_type': resource_type,
+        'year': int(year_match.group()) if year_match else None,
+        'publisher': clean_heading(publisher)[:200],
+        'view_url': view_url if len(view_url) <= 200 else '',
+        'metadata': metadata,
+    }
+
+
+def record_work_identifiers(record, external_id, fields, source='koha'):
+    """Identifiers that tie a MARC record to the same work in other systems"""
+    identifiers = [(SOURCE_SCHEMES[source], external_id)] if source in SOURCE_SCHEMES else []
+    identifiers += [('isbn', normalize_isbn(isbn)) for isbn in all_subfields(record, '020', 'a')]
+    identifiers += [('issn', normalize_issn(issn)) for issn in all_subfields(record, '022', 'a')]
+    # Records catalogued from DSpace carry the handle URL in 856$u
+    identifiers += [('dspace_handle', handle_from_url(url)) for url in all_subfields(record, '856', 'u')]
+    identifiers.append(('title_year', title_year_key(fields['title'], fields['year'])))
+    return identifiers
+
+
+def import_records(records, source='koha', batch_size=2000, progress=None):
+    """Upsert MARC records into Resource in batches keyed by (source, external_id)"""
+    stats = {'imported': 0, 'skipped': 0}
+    batch = {}
+    identifiers = {}
+
+    def flush():
+        Resource.objects.bulk_create(
+            batch.values(),
+            update_conflicts=True,
+            unique_fields=['source', 'external_id'],
+            update_fields=UPDATE_FIELDS
+        )
+        register_works([(pairs, None) for pairs in identifiers.values()])
+        stats['imported'] += len(batch)
+        batch.clear()
+        identifiers.clear()
+        if progress:
+            progress(stats)
+
+    for record in records:
+        external_id = record_identifier(record)[:100]
+        fields = record_to_resource_fields(record)
+        if not external_id or not fields['title']:
+            stats['skipped'] += 1
+            continue
+
+        # Later duplicates in the same batch win; one upsert may not touch a row twice
+        batch[external_id] = Resource(source=source, external_id=external_id, **fields)
+        identifiers[external_id] = record_work_identifiers(record, external_id, fields, source)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    # bulk_create skips post_save, so invalidate cached versions explicitly
+    if stats['imported']:
+        bump_version('resources', 'resources:bulk')
+    return stats
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Resource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=500)),
+                ('authors', models.CharField(blank=True, max_length=500)),
+                ('description', models.TextField(blank=True)),
+                ('source', models.CharField(choices=[('koha', 'Koha'), ('dspace', 'DSpace')], max_length=10)),
+                ('resource_type', models.CharField(choices=[('book', 'Book'), ('article', 'Article'), ('thesis', 'Thesis'), ('report', 'Report'), ('image', 'Image'), ('document', 'Document')], max_length=20)),
+                ('year', models.IntegerField(blank=True, null=True)),
+                ('publisher', models.CharField(blank=True, max_length=200)),
+                ('external_id', models.CharField(max_length=100)),
+                ('download_url', models.URLField(blank=True)),
+                ('view_url', models.URLField(blank=True)),
+                ('thumbnail_url', models.URLField(blank=True)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('download_count', models.IntegerField(default=0)),
+                ('view_count', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'external_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=500)),
+                ('results_count', models.IntegerField()),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DownloadLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resources.resource')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UploadedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=500)),
+                ('description', models.TextField(blank=True)),
+                ('file', models.FileField(upload_to='uploads/')),
+                ('dspace_id', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='downloadlog',
+            index=models.Index(fields=['timestamp'], name='downloadlog_time'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['source', 'resource_type', 'year'], name='resource_source_type_year'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['resource_type', 'year'], name='resource_type_year'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['year'], name='resource_year'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['-created_at'], name='resource_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['updated_at'], name='resource_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('download_count__gt', 0)), fields=['-download_count'], name='resource_popular'),
+        ),
+        migrations.AddIndex(
+            model_name='searchlog',
+            index=models.Index(fields=['timestamp', 'query'], name='searchlog_time_query'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KohaCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=100)),
+                ('row_number', models.IntegerField()),
+                ('title', models.CharField(blank=True, max_length=500)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('item_failed', 'Item Failed'), ('failed', 'Failed')], max_length=20)),
+                ('biblio_id', models.CharField(blank=True, max_length=50)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('job', 'row_number')},
+            },
+        ),
+    ]
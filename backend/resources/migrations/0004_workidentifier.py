@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_kohacatalogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheme', models.CharField(choices=[('dspace_uuid', 'DSpace UUID'), ('dspace_handle', 'DSpace Handle'), ('koha_biblio', 'Koha Biblio ID'), ('vufind_id', 'VuFind ID'), ('isbn', 'ISBN'), ('issn', 'ISSN'), ('title_year', 'Title + Year')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('work', models.CharField(db_index=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='identifiers', to='resources.resource')),
+            ],
+            options={
+                'unique_together': {('scheme', 'value')},
+            },
+        ),
+    ]
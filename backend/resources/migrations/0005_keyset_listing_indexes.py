@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_workidentifier'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='downloadlog',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='downloadlog_user_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedfile',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='uploadedfile_user_recent'),
+        ),
+    ]
@@ -38,6 +38,22 @@ class Resource(models.Model):
     
     class Meta:
         unique_together = ['source', 'external_id']
+        # Shaped after the hot queries; resources/tests.py checks none of them scans the table
+        indexes = [
+            # Search filters and facet counts: source + type + year, type + year, year
+            models.Index(fields=['source', 'resource_type', 'year'], name='resource_source_type_year'),
+            models.Index(fields=['resource_type', 'year'], name='resource_type_year'),
+            models.Index(fields=['year'], name='resource_year'),
+            # recent_resources
+            models.Index(fields=['-created_at'], name='resource_recent'),
+            # Incremental suggest index refresh
+            models.Index(fields=['updated_at'], name='resource_updated'),
+            # Most downloaded: only rows that were ever downloaded are indexed
+            models.Index(
+                fields=['-download_count'], name='resource_popular',
+                condition=models.Q(download_count__gt=0)
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -48,10 +64,24 @@ class SearchLog(models.Model):
     results_count = models.IntegerField()
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Top searches over a date range, answered from the index alone
+            models.Index(fields=['timestamp', 'query'], name='searchlog_time_query'),
+        ]
+    
 class DownloadLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     resource = models.ForeignKey(Resource, on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            # Keyset pages of a user's downloads: WHERE user_id = ? AND (timestamp, id) < (?, ?)
+            models.Index(fields=['user', '-timestamp', '-id'], name='downloadlog_user_recent'),
+            # Dashboard date ranges
+            models.Index(fields=['timestamp'], name='downloadlog_time'),
+        ]
 
 class UploadedFile(models.Model):
     title = models.CharField(max_length=500)
@@ -61,5 +91,62 @@ class UploadedFile(models.Model):
     dspace_id = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='uploadedfile_user_recent'),
+        ]
+    
+    def __str__(self):
+        return self.title
+
+class KohaCatalogEntry(models.Model):
+    STATUS_CHOICES = [
+        ('done', 'Done'),
+        ('item_failed', 'Item Failed'),
+        ('failed', 'Failed'),
+    ]
+    
+    job = models.CharField(max_length=100)
+    row_number = models.IntegerField()
+    title = models.CharField(max_length=500, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    biblio_id = models.CharField(max_length=50, blank=True)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['job', 'row_number']
+    
+    def __str__(self):
+        return f"{self.job} #{self.row_number}: {self.status}"
+
+class WorkIdentifier(models.Model):
+    SCHEME_CHOICES = [
+        ('dspace_uuid', 'DSpace UUID'),
+        ('dspace_handle', 'DSpace Handle'),
+        ('koha_biblio', 'Koha Biblio ID'),
+        ('vufind_id', 'VuFind ID'),
+        ('isbn', 'ISBN'),
+        ('issn', 'ISSN'),
+        ('title_year', 'Title + Year'),
+    ]
+    
+    scheme = models.CharField(max_length=20, choices=SCHEME_CHOICES)
+    value = models.CharField(max_length=255)
+    work = models.CharField(max_length=32, db_index=True)
+    resource = models.ForeignKey(Resource, on_delete=models.SET_NULL, null=True, blank=True, related_name='identifiers')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['scheme', 'value']
+    
+    def __str__(self):
+        return f"{self.scheme}:{self.value} -> {self.work}"
+
+class TermFrequency(models.Model):
+    """Local resources containing each whole token; rebuilt by ranking.refresh_term_frequencies"""
+    term = models.CharField(max_length=100, unique=True)
+    documents = models.IntegerField()
+    
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.term}: {self.documents}"
@@ -0,0 +1,67 @@
+import base64
+import binascii
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.response import Response
+
+
+class InvalidPageCursor(ValueError):
+    pass
+
+
+def encode_position(value, pk):
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_position(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, pk = raw.rsplit('|', 1)
+        position = parse_datetime(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidPageCursor('Malformed cursor')
+    if position[0] is None:
+        raise InvalidPageCursor('Malformed cursor')
+    return position
+
+
+def keyset_queryset(queryset, field, cursor=None):
+    """``queryset`` newest first on (field, id), starting after ``cursor``"""
+    queryset = queryset.order_by(f'-{field}', '-id')
+    if cursor:
+        value, pk = decode_position(cursor)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+    return queryset
+
+
+def keyset_page(queryset, field, cursor=None, limit=20):
+    """Newest-first page of ``queryset`` after ``cursor``, seeking on (field, id).
+
+    Each page is an index range scan on (..., field, id) regardless of how deep
+    it is, unlike OFFSET. Returns the rows and the cursor of the next page
+    (None on the last one).
+    """
+    rows = list(keyset_queryset(queryset, field, cursor)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_position(getattr(rows[-1], field), rows[-1].pk)
+
+
+def page_limit(request, default=20, maximum=200):
+    try:
+        return max(1, min(int(request.GET.get('limit', default)), maximum))
+    except ValueError:
+        return default
+
+
+def paginated_response(request, data, next_cursor):
+    """List response whose next page is announced in a Link header, keeping the body a plain array"""
+    response = Response(data)
+    if next_cursor:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        response['Link'] = f'<{request.build_absolute_uri(request.path)}?{query.urlencode()}>; rel="next"'
+        response['X-Next-Cursor'] = next_cursor
+    return response
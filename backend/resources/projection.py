@@ -0,0 +1,139 @@
+class SearchResult:
+    """Normalized search hit shared by every source"""
+    __slots__ = (
+        'id', 'title', 'authors', 'source', 'source_name', 'external_id',
+        'resource_type', 'year', 'description', 'url', 'download_url', 'availability', 'score', 'links'
+    )
+
+    def __init__(self, id='', title='', authors='', source='', source_name='', external_id='',
+                 resource_type='', year='', description='', url='', download_url='', availability='',
+                 score=0.0, links=None):
+        self.id = id
+        self.title = title
+        self.authors = authors
+        self.source = source
+        self.source_name = source_name
+        self.external_id = external_id
+        self.resource_type = resource_type
+        self.year = year
+        self.description = description
+        self.url = url
+        self.download_url = download_url
+        self.availability = availability
+        self.score = score
+        # Access links of every source holding this work, set when duplicates are collapsed
+        self.links = links
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"<SearchResult {self.id}: {self.title!r}>"
+
+
+# The extractors fill every slot of a bare instance directly: a 14-keyword
+# __init__ call costs more than the dict literals they replace
+_new = SearchResult.__new__
+
+
+def project_koha(item):
+    biblio_id = item.get('biblio_id', '')
+    result = _new(SearchResult)
+    result.id = f"koha_{biblio_id}"
+    result.title = item.get('title', 'No Title')
+    result.authors = item.get('author', '')
+    result.source = 'koha'
+    result.source_name = 'Library Catalog'
+    result.external_id = str(biblio_id)
+    result.resource_type = 'book'
+    result.year = item.get('copyright_date', '')
+    result.description = item.get('abstract', '')
+    result.url = f"http://127.0.0.1:8085/cgi-bin/koha/catalogue/detail.pl?biblionumber={biblio_id}"
+    result.download_url = ''
+    result.availability = 'Available'
+    result.score = 0.0
+    result.links = None
+    return result
+
+
+def project_dspace(item):
+    # DSpace wraps search hits in _embedded.indexableObject
+    obj = (item.get('_embedded') or {}).get('indexableObject') or {}
+    metadata = obj.get('metadata') or {}
+    handle = obj.get('handle')
+    uuid = obj.get('uuid', '')
+    result = _new(SearchResult)
+    result.id = f"dspace_{uuid}"
+    result.title = obj.get('name', '')
+    result.authors = ', '.join([
+        entry.get('value', '')
+        for field in ('dc.contributor.author', 'dc.creator')
+        for entry in (metadata.get(field) or ())
+    ])
+    result.source = 'dspace'
+    result.source_name = 'Research Repository'
+    result.external_id = handle or uuid or ''
+    # dc.type ("Thesis", ...) is what the f.itemtype filter matches; obj['type'] is always "item"
+    entries = metadata.get('dc.type')
+    result.resource_type = (entries[0].get('value') or 'document').lower() if entries else 'document'
+    entries = metadata.get('dc.date.issued') or metadata.get('dc.date.created')
+    result.year = entries[0].get('value', '')[:4] if entries else ''
+    entries = metadata.get('dc.description.abstract') or metadata.get('dc.description')
+    result.description = entries[0].get('value', '') if entries else ''
+    result.url = f"http://localhost:4000/handle/{handle}" if handle else f"http://localhost:4000/items/{uuid}"
+    result.download_url = ''
+    result.availability = 'Open Access'
+    result.score = 0.0
+    result.links = None
+    return result
+
+
+def project_vufind(item):
+    # VuFind returns most fields as lists; the first entry is used
+    record_id = item.get('id', '')
+    result = _new(SearchResult)
+    result.id = f"vufind_{record_id}"
+    result.title = item.get('title', '')
+    value = item.get('author', '')
+    result.authors = ', '.join(value) if value.__class__ is list else value
+    result.source = 'vufind'
+    result.source_name = 'Discovery Layer'
+    result.external_id = record_id
+    value = item.get('format', 'Unknown')
+    result.resource_type = (value[0] if value else 'Unknown') if value.__class__ is list else value
+    value = item.get('publishDate', '')
+    result.year = (value[0] if value else '') if value.__class__ is list else value
+    value = item.get('summary', '')
+    result.description = (value[0] if value else '') if value.__class__ is list else value
+    result.url = f"http://localhost:8090/Record/{record_id}"
+    result.download_url = ''
+    result.availability = 'Check Availability'
+    result.score = 0.0
+    result.links = None
+    return result
+
+
+def project_local(row):
+    result = _new(SearchResult)
+    result.id = row['id']
+    result.title = row['title']
+    result.authors = row['authors']
+    result.source = row['source']
+    result.source_name = 'Local Repository' if row['source'] == 'local' else 'DSpace Repository'
+    result.external_id = row['external_id']
+    result.resource_type = row['resource_type']
+    result.year = row['year']
+    result.description = row['description']
+    result.url = row['view_url'] or f"/api/resources/{row['id']}/preview/"
+    result.download_url = row['download_url']
+    result.availability = 'Available'
+    result.score = 0.0
+    result.links = None
+    return result
+
+
+# Resource columns read for project_local via QuerySet.values()
+LOCAL_FIELDS = (
+    'id', 'title', 'authors', 'source', 'external_id', 'resource_type',
+    'year', 'description', 'view_url', 'download_url'
+)
@@ -0,0 +1,159 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from itertools import count
+from django.core.cache import cache
+from django.db import connection, transaction
+from .models import Resource, TermFrequency
+
+# BM25 parameters and per-field term weights (a BM25F-style weighted term frequency)
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = (('title', 3.0), ('authors', 2.0), ('description', 1.0))
+
+# Corpus statistics are rebuilt in the background once they are this old (seconds);
+# they drift slowly, so saves and deletes do not invalidate them
+STATS_TTL = 3600
+STATS_KEY = 'ranking:corpus'
+REFRESH_LOCK = 'ranking:refreshing'
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+MAX_TERM_LENGTH = 100
+TERM_BATCH = 2000
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text or '').lower())
+
+
+def refresh_term_frequencies():
+    """Recount whole-token document frequencies and corpus statistics of the local index.
+
+    One pass over the resources; the TermFrequency table is replaced in a
+    single transaction, so readers see either the old or the new counts.
+    """
+    frequencies = Counter()
+    documents = total_length = 0
+    for title, authors, description in Resource.objects.values_list(
+        'title', 'authors', 'description'
+    ).iterator(chunk_size=TERM_BATCH):
+        documents += 1
+        total_length += len(title or '') + len(authors or '') + len(description or '')
+        frequencies.update({
+            token for token in tokenize(title) + tokenize(authors) + tokenize(description)
+            if len(token) <= MAX_TERM_LENGTH
+        })
+
+    with transaction.atomic():
+        TermFrequency.objects.all().delete()
+        TermFrequency.objects.bulk_create(
+            (TermFrequency(term=term, documents=count) for term, count in frequencies.items()),
+            batch_size=TERM_BATCH
+        )
+
+    stats = {
+        'documents': documents,
+        'avg_length': total_length / documents if documents else 0.0,
+        'refreshed_at': time.time()
+    }
+    cache.set(STATS_KEY, stats, None)
+    return stats
+
+
+def _refresh_in_background():
+    try:
+        refresh_term_frequencies()
+        print("✅ Ranking statistics refreshed")
+    except Exception as e:
+        print(f"⚠️ Ranking statistics refresh failed: {e}")
+    finally:
+        cache.delete(REFRESH_LOCK)
+        connection.close()
+
+
+def schedule_refresh():
+    """Start one background refresh across all workers, unless one is already running"""
+    if cache.add(REFRESH_LOCK, True, STATS_TTL):
+        threading.Thread(target=_refresh_in_background, daemon=True, name='ranking-stats').start()
+
+
+def corpus_stats():
+    """Document count and average document length (characters) of the local index.
+
+    Never computed on the request path: stale or missing statistics start a
+    background refresh, and the old values (or an empty corpus) are used meanwhile.
+    """
+    stats = cache.get(STATS_KEY)
+    if stats is None or time.time() - stats['refreshed_at'] > STATS_TTL:
+        schedule_refresh()
+    return stats or {'documents': 0, 'avg_length': 0.0}
+
+
+def document_frequencies(terms):
+    """How many local resources contain each term as a whole token (one indexed lookup)"""
+    frequencies = dict.fromkeys(terms, 0)
+    frequencies.update(TermFrequency.objects.filter(term__in=list(terms)).values_list('term', 'documents'))
+    return frequencies
+
+
+class BM25Scorer:
+    """Scores normalized hits from any source against one query with shared statistics"""
+
+    def __init__(self, query):
+        self.terms = list(dict.fromkeys(tokenize(query)))
+        self.idf = {}
+        self.avg_length = 1.0
+        if not self.terms:
+            return
+
+        stats = corpus_stats()
+        documents = stats['documents']
+        self.avg_length = stats['avg_length'] or 1.0
+        for term, frequency in document_frequencies(self.terms).items():
+            self.idf[term] = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+
+    def score(self, result):
+        if not self.terms:
+            return 0.0
+
+        frequencies = {}
+        length = 0
+        for field, weight in FIELD_WEIGHTS:
+            value = str(getattr(result, field) or '')
+            length += len(value)
+            for token in tokenize(value):
+                if token in self.idf:
+                    frequencies[token] = frequencies.get(token, 0) + weight
+
+        norm = K1 * (1 - B + B * length / self.avg_length)
+        return sum(
+            self.idf[term] * tf * (K1 + 1) / (tf + norm)
+            for term, tf in frequencies.items()
+        ) if frequencies else 0.0
+
+
+def merge_top_k(candidates, k, scorer):
+    """Pick the k best hits across sources.
+
+    ``candidates`` maps source -> hits in the order the source returned them.
+    Every hit is scored (a page only has about ``k`` candidates) and a bounded
+    min-heap keeps the current top k. Every hit gets its ``score`` set.
+    Returns the top k, best first, and the set of ids that were selected.
+    """
+    heap = []
+    tiebreak = count()
+
+    for hits in candidates.values():
+        for hit in hits:
+            hit.score = round(scorer.score(hit), 4)
+            # Earlier hits win ties, so an empty query keeps source order
+            entry = (hit.score, -next(tiebreak), hit)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    top = [hit for _, _, hit in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+    return top, {id(hit) for hit in top}
@@ -1,4 +1,5 @@
 import requests
+from backend.metrics import instrument_session
 import json
 
 class RealDSpaceAPI:
@@ -8,7 +9,7 @@ class RealDSpaceAPI:
         self.password = "dspace"
         self.token = None
         self.csrf_token = None
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session(), 'dspace')
     
     def authenticate(self):
         """Simple DSpace authentication check"""
@@ -79,16 +80,23 @@ class RealDSpaceAPI:
             print(f"DSpace file upload error: {e}")
             return None
     
-    def search_items(self, query, limit=20):
-        """Search DSpace items using discover API"""
+    def search_items(self, query, limit=20, page=0, filters=None):
+        """Search DSpace items using discover API (``page`` is zero based)"""
         try:
             # Use the discover search API endpoint
             params = {
                 'query': query if query else '*',  # Use wildcard for empty query
-                'page': 0,
+                'page': page,
                 'size': limit
             }
             
+            # Type and year become discover filters so DSpace only returns matching items
+            filters = filters or {}
+            if filters.get('type'):
+                params['f.itemtype'] = f"{filters['type'].capitalize()},equals"
+            if filters.get('year'):
+                params['f.dateIssued'] = f"[{filters['year']} TO {filters['year']}],equals"
+            
             response = self.session.get(
                 f"{self.base_url}/discover/search/objects",
                 params=params,
@@ -108,6 +116,33 @@ class RealDSpaceAPI:
             print(f"DSpace search error: {e}")
             return []
     
+    def get_items(self, uuids):
+        """Fetch several items by UUID with one discover query"""
+        if not uuids:
+            return []
+        try:
+            params = {
+                'query': 'search.resourceid:(' + ' OR '.join(f'"{uuid}"' for uuid in uuids) + ')',
+                'dsoType': 'ITEM',
+                'size': len(uuids)
+            }
+            
+            response = self.session.get(
+                f"{self.base_url}/discover/search/objects",
+                params=params,
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                return data.get('_embedded', {}).get('searchResult', {}).get('_embedded', {}).get('objects', [])
+            
+            print(f"⚠️ DSpace lookup returned status {response.status_code}")
+            return []
+        except Exception as e:
+            print(f"DSpace lookup error: {e}")
+            return []
+    
     def update_metadata(self, workspace_id, metadata):
         """Mock metadata update"""
         try:
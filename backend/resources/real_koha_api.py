@@ -1,12 +1,17 @@
+import io
 import requests
+from backend.metrics import instrument_session
 import json
 import xml.etree.ElementTree as ET
 from django.conf import settings
+from .marc_import import MARC_NS, first_subfield, marcxml_record, record_identifier
+
+SRW_NS = '{http://www.loc.gov/zing/srw/}'
 
 class RealKohaAPI:
     def __init__(self):
         self.base_url = settings.KOHA_API_URL
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session(), 'koha')
         self.api_key = None
     
     def authenticate(self):
@@ -77,44 +82,122 @@ class RealKohaAPI:
             return None
     
     def search_biblios(self, query, limit=20):
-        """Search real Koha biblios"""
+        """Search real Koha biblios, yielding each record as soon as it is parsed"""
+        records = self.iter_sru_records(query, max_records=limit)
         try:
-            # Try SRU search first
-            sru_url = f"{self.base_url}/cgi-bin/koha/sru"
+            # Try SRU search first; the first page tells whether it is available
+            try:
+                first = next(records)
+            except StopIteration:
+                return
+            except requests.RequestException as e:
+                print(f"⚠️ Koha SRU unavailable: {e}")
+                yield from self._opac_search(query, limit)
+                return
+            
+            yield first
+            count = 1
+            for record in records:
+                yield record
+                count += 1
+            print(f"✅ Koha SRU search found {count} records")
+        except Exception as e:
+            print(f"Koha search error: {e}")
+    
+    def _opac_search(self, query, limit):
+        """Fallback to OPAC search"""
+        opac_url = f"{self.base_url}/cgi-bin/koha/opac-search.pl"
+        params = {
+            'q': query,
+            'format': 'rss',
+            'count': limit
+        }
+        
+        response = self.session.get(opac_url, params=params, timeout=10)
+        if response.status_code == 200:
+            # Parse RSS response
+            records = self._parse_rss_response(response.content)
+            print(f"✅ Koha OPAC search found {len(records)} records")
+            return records
+        
+        return []
+    
+    def iter_sru_records(self, query, page_size=50, max_records=None):
+        """Lazily yield SRU results, requesting the next page only when the previous one is consumed"""
+        sru_url = f"{self.base_url}/cgi-bin/koha/sru"
+        start = 1
+        yielded = 0
+        
+        while max_records is None or yielded < max_records:
+            size = page_size if max_records is None else min(page_size, max_records - yielded)
             params = {
                 'version': '1.1',
                 'operation': 'searchRetrieve',
                 'query': f'title="{query}" or author="{query}" or subject="{query}"',
-                'maximumRecords': limit,
+                'startRecord': start,
+                'maximumRecords': size,
                 'recordSchema': 'marcxml'
             }
             
-            response = self.session.get(sru_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                records = self._parse_sru_response(response.content)
-                print(f"✅ Koha SRU search found {len(records)} records")
-                return records
+            response = self.session.get(sru_url, params=params, timeout=10, stream=True)
+            if response.status_code != 200:
+                response.close()
+                if start == 1:
+                    raise requests.HTTPError(f"SRU returned status {response.status_code}", response=response)
+                return
             
-            # Fallback to OPAC search
-            opac_url = f"{self.base_url}/cgi-bin/koha/opac-search.pl"
-            params = {
-                'q': query,
-                'format': 'rss',
-                'count': limit
-            }
+            page = {}
+            try:
+                response.raw.decode_content = True
+                for record in self._iter_sru_page(response.raw, page):
+                    yield record
+                    yielded += 1
+                    if max_records is not None and yielded >= max_records:
+                        return
+            finally:
+                response.close()
             
-            response = self.session.get(opac_url, params=params, timeout=10)
-            if response.status_code == 200:
-                # Parse RSS response
-                records = self._parse_rss_response(response.content)
-                print(f"✅ Koha OPAC search found {len(records)} records")
-                return records
+            # SRU omits nextRecordPosition on the last page
+            next_position = page.get('next')
+            if not next_position or next_position <= start:
+                return
+            start = next_position
+    
+    def _iter_sru_page(self, stream, page):
+        """Parse one SRU response incrementally; paging info is stored in ``page``.
+        
+        Each srw:record is cleared and detached from srw:records once its MARC
+        record has been yielded, so only the record being read is in memory.
+        """
+        records = None
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == f'{SRW_NS}records':
+                    records = elem
+                continue
             
-            return []
-        except Exception as e:
-            print(f"Koha search error: {e}")
-            return []
+            if elem.tag == f'{MARC_NS}record':
+                record = self._sru_record(marcxml_record(elem))
+                elem.clear()
+                yield record
+            elif elem.tag == f'{SRW_NS}record':
+                elem.clear()
+                if records is not None:
+                    records.remove(elem)
+            elif elem.tag == f'{SRW_NS}nextRecordPosition' and elem.text:
+                page['next'] = int(elem.text)
+            elif elem.tag == f'{SRW_NS}numberOfRecords' and elem.text:
+                page['total'] = int(elem.text)
+    
+    def _sru_record(self, record):
+        return {
+            'biblionumber': record_identifier(record),
+            'title': first_subfield(record, '245', 'a') or 'Unknown Title',
+            'author': first_subfield(record, '100', 'a'),
+            'copyrightdate': first_subfield(record, '260', 'c'),
+            'notes': 'From Koha catalog',
+            'items_count': len(record.get('952', [])) or 1
+        }
     
     def _create_marcxml(self, metadata):
         """Create MARCXML from metadata"""
@@ -164,24 +247,7 @@ class RealKohaAPI:
     def _parse_sru_response(self, xml_content):
         """Parse SRU XML response"""
         try:
-            root = ET.fromstring(xml_content)
-            records = []
-            
-            for record in root.findall('.//{http://www.loc.gov/zing/srw/}record'):
-                title_elem = record.find('.//{http://www.loc.gov/MARC21/slim}datafield[@tag="245"]/{http://www.loc.gov/MARC21/slim}subfield[@code="a"]')
-                author_elem = record.find('.//{http://www.loc.gov/MARC21/slim}datafield[@tag="100"]/{http://www.loc.gov/MARC21/slim}subfield[@code="a"]')
-                year_elem = record.find('.//{http://www.loc.gov/MARC21/slim}datafield[@tag="260"]/{http://www.loc.gov/MARC21/slim}subfield[@code="c"]')
-                
-                records.append({
-                    'biblionumber': len(records) + 1,
-                    'title': title_elem.text if title_elem is not None else 'Unknown Title',
-                    'author': author_elem.text if author_elem is not None else '',
-                    'copyrightdate': year_elem.text if year_elem is not None else '',
-                    'notes': 'From Koha catalog',
-                    'items_count': 1
-                })
-            
-            return records
+            return list(self._iter_sru_page(io.BytesIO(xml_content), {}))
         except Exception as e:
             print(f"SRU parse error: {e}")
             return []
@@ -1,4 +1,5 @@
 import requests
+from backend.metrics import instrument_session
 import json
 from django.conf import settings
 
@@ -6,7 +7,7 @@ class RealVuFindAPI:
     def __init__(self):
         self.base_url = "http://localhost:8090"
         self.solr_url = "http://localhost:8983/solr"
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session(), 'vufind')
     
     def test_connection(self):
         """Test VuFind connection"""
@@ -22,16 +23,28 @@ class RealVuFindAPI:
             print(f"VuFind connection error: {e}")
             return False
     
-    def search_records(self, query, limit=20):
-        """Search VuFind records"""
+    def _filter_queries(self, filters):
+        """Search filters as Solr field queries (VuFind ``filter[]`` uses the same syntax)"""
+        filters = filters or {}
+        queries = []
+        if filters.get('type'):
+            queries.append(f'format:"{filters["type"].capitalize()}"')
+        if filters.get('year'):
+            queries.append(f'publishDate:"{filters["year"]}"')
+        return queries
+    
+    def search_records(self, query, limit=20, page=1, filters=None):
+        """Search VuFind records (``page`` is one based)"""
         try:
             # Try VuFind API first
             api_url = f"{self.base_url}/api/v1/search"
             params = {
                 'lookfor': query,
                 'limit': limit,
+                'page': page,
                 'type': 'AllFields',
-                'format': 'json'
+                'format': 'json',
+                'filter[]': self._filter_queries(filters)
             }
             
             response = self.session.get(api_url, params=params, timeout=10)
@@ -43,13 +56,13 @@ class RealVuFindAPI:
                 return records
             
             # Fallback to Solr direct search
-            return self._search_solr_direct(query, limit)
+            return self._search_solr_direct(query, limit, (page - 1) * limit, filters)
             
         except Exception as e:
             print(f"VuFind search error: {e}")
-            return self._search_solr_direct(query, limit)
+            return self._search_solr_direct(query, limit, (page - 1) * limit, filters)
     
-    def _search_solr_direct(self, query, limit):
+    def _search_solr_direct(self, query, limit, start=0, filters=None):
         """Search Solr directly"""
         try:
             # Try biblio core first
@@ -60,6 +73,8 @@ class RealVuFindAPI:
                 params = {
                     'q': f'title:"{query}" OR author:"{query}" OR subject:"{query}"',
                     'rows': limit,
+                    'start': start,
+                    'fq': self._filter_queries(filters),
                     'wt': 'json',
                     'fl': 'id,title,author,publishDate,format,summary,isbn,subject'
                 }
@@ -101,6 +116,26 @@ class RealVuFindAPI:
             return field_value[0] if field_value else ''
         return field_value or ''
     
+    def get_records(self, record_ids):
+        """Fetch several records in one call to the record API"""
+        if not record_ids:
+            return []
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/v1/record",
+                params={'id[]': list(record_ids)},
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                return response.json().get('records', [])
+            
+            print(f"⚠️ VuFind lookup returned status {response.status_code}")
+            return []
+        except Exception as e:
+            print(f"VuFind lookup error: {e}")
+            return []
+    
     def get_record_details(self, record_id):
         """Get detailed record information"""
         try:
@@ -0,0 +1,52 @@
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+from .projection import SearchResult
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ResultJSONEncoder(JSONEncoder):
+    """DRF encoder that also understands slotted SearchResult records"""
+
+    def default(self, obj):
+        if isinstance(obj, SearchResult):
+            return obj.to_dict()
+        return super().default(obj)
+
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder so the output format does not change
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _encode_default = ResultJSONEncoder().default
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSON renderer that uses orjson when installed and DRF's stdlib renderer otherwise"""
+    encoder_class = ResultJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return orjson.dumps(data, default=_encode_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder handles them
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """Lets views that return a StreamingHttpResponse accept ``Accept: text/event-stream``"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only reached for error responses; event streams bypass renderers
+        return JSONRenderer().render(data)
@@ -1,29 +1,70 @@
 from rest_framework import serializers
 from .models import Resource, SearchLog, DownloadLog, UploadedFile
 
-class ResourceSerializer(serializers.ModelSerializer):
+# Columns shipped by Resource listings unless ?fields= asks for more (metadata is the big one)
+RESOURCE_LIST_FIELDS = [
+    'id', 'title', 'authors', 'description', 'source', 'resource_type', 'year',
+    'publisher', 'external_id', 'download_url', 'view_url', 'thumbnail_url',
+    'file_size', 'download_count', 'view_count', 'created_at'
+]
+
+
+def sparse_fields(request, default, allowed):
+    """Field names for a response: ?fields= (limited to ``allowed``) or ``default``, minus ?omit="""
+    def parse(name):
+        return [field.strip() for field in request.GET.get(name, '').split(',') if field.strip()]
+
+    requested = [field for field in parse('fields') if field in allowed]
+    omitted = set(parse('omit'))
+    # Omitting everything still returns ids rather than every column
+    return [field for field in (requested or default) if field not in omitted] or ['id']
+
+class SparseFieldsMixin:
+    """Serializer that only keeps the fields named in its ``fields`` argument"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class ResourceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Resource
         fields = '__all__'
 
+class ResourceListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Listing serializer; also accepts the dicts of Resource.objects.values(*fields)"""
+    class Meta:
+        model = Resource
+        fields = RESOURCE_LIST_FIELDS + ['metadata', 'updated_at']
+
 class SearchLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = SearchLog
         fields = '__all__'
 
-class DownloadLogSerializer(serializers.ModelSerializer):
+class DownloadLogSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     resource_title = serializers.CharField(source='resource.title', read_only=True)
-    
+
+    # Database columns behind each output field, for QuerySet.only()
+    COLUMNS = {'id': 'id', 'resource': 'resource', 'resource_title': 'resource__title', 'timestamp': 'timestamp'}
+
     class Meta:
         model = DownloadLog
         fields = ['id', 'resource', 'resource_title', 'timestamp']
 
-class UploadedFileSerializer(serializers.ModelSerializer):
+class UploadedFileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
-    
+
+    COLUMNS = {
+        'id': 'id', 'title': 'title', 'description': 'description',
+        'file_url': 'file', 'dspace_id': 'dspace_id', 'created_at': 'created_at'
+    }
+
     class Meta:
         model = UploadedFile
         fields = ['id', 'title', 'description', 'file_url', 'dspace_id', 'created_at']
-    
+
     def get_file_url(self, obj):
-        return obj.file.url if obj.file else None
\ No newline at end of file
+        return obj.file.url if obj.file else None
@@ -1,166 +1,291 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import time
 from django.conf import settings
+from django.core.cache import cache
+from backend.metrics import record_cache
+from django.db import connection
+from django.db.models import Count, Q
+from .models import Resource
 from .real_dspace_api import RealDSpaceAPI
 from .koha_rest_api import KohaRestAPI
 from .real_vufind_api import RealVuFindAPI
+from .projection import project_koha, project_dspace, project_vufind, project_local, LOCAL_FIELDS
+
+def fetch_offset_slice(fetch_page, offset, count, page_size):
+    """Read ``count`` items starting at ``offset`` from a page based API.
+
+    ``fetch_page(page_index, page_size)`` returns one zero-based page. Returns
+    the items and the offset after them, or None once the source is exhausted.
+    """
+    items = []
+    page = offset // page_size
+    skip = offset % page_size
+    
+    while len(items) < count:
+        batch = fetch_page(page, page_size)
+        items.extend(batch[skip:])
+        if len(batch) < page_size:
+            if len(items) <= count:
+                return items, None
+            break
+        page += 1
+        skip = 0
+    
+    items = items[:count]
+    return items, offset + len(items)
 
 class KohaService:
     @staticmethod
-    def search_resources(query, limit=20):
+    def search_page(query, offset=0, limit=20, filters=None):
+        """(biblios, next_offset) with next_offset None once Koha has no more matches"""
         koha_api = KohaRestAPI()
         
         if koha_api.authenticate():
-            # Get all biblios
-            all_biblios = koha_api.search_biblios('', 50)
-            
-            if not query:  # If no query, return all
-                return all_biblios[:limit]
-            
-            filtered = []
-            for biblio in all_biblios:
-                title = str(biblio.get('title', '')).lower()
-                author = str(biblio.get('author', '')).lower()
-                notes = str(biblio.get('notes', '')).lower()
-                
-                if (query.lower() in title or 
-                    query.lower() in author or 
-                    query.lower() in notes):
-                    filtered.append(biblio)
-                    
-                if len(filtered) >= limit:
-                    break
-            
-            return filtered
+            # Koha does the matching, so one page request returns one page of matches
+            return fetch_offset_slice(
+                lambda page, size: koha_api.search_biblios(query, size, page + 1, filters),
+                offset, limit, max(limit, 1)
+            )
         
         print("⚠️ Koha API not available")
-        return []
+        return [], None
+    
+    @staticmethod
+    def search_resources(query, limit=20):
+        return KohaService.search_page(query, 0, limit)[0]
 
 class DSpaceService:
     @staticmethod
-    def search_resources(query, limit=20):
+    def search_page(query, offset=0, limit=20, filters=None):
+        """(items, next_offset) with next_offset None once DSpace has no more hits"""
         dspace_api = RealDSpaceAPI()
         
         if dspace_api.authenticate():
-            return dspace_api.search_items(query, limit)
+            return fetch_offset_slice(
+                lambda page, size: dspace_api.search_items(query, size, page, filters),
+                offset, limit, max(limit, 1)
+            )
         
         print("⚠️ DSpace API not available")
-        return []
+        return [], None
+    
+    @staticmethod
+    def search_resources(query, limit=20):
+        return DSpaceService.search_page(query, 0, limit)[0]
 
 class VuFindService:
     @staticmethod
-    def search_resources(query, limit=20):
+    def search_page(query, offset=0, limit=20, filters=None):
+        """(records, next_offset) with next_offset None once VuFind has no more hits"""
         vufind_api = RealVuFindAPI()
         
         if vufind_api.test_connection():
-            return vufind_api.search_records(query, limit)
+            return fetch_offset_slice(
+                lambda page, size: vufind_api.search_records(query, size, page + 1, filters),
+                offset, limit, max(limit, 1)
+            )
         
         print("⚠️ VuFind API not available")
-        return []
+        return [], None
+    
+    @staticmethod
+    def search_resources(query, limit=20):
+        return VuFindService.search_page(query, 0, limit)[0]
+
+# Shared pool for federated search fan-out; each request submits one task per source
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=12, thread_name_prefix='federated-search')
+
+REMOTE_SOURCES = ('koha', 'dspace', 'vufind')
+
+# Filters each backend applies itself; the rest are checked on the normalized hits
+FILTER_PUSHDOWN = {
+    'koha': ('year',),
+    'dspace': ('type', 'year'),
+    'vufind': ('type', 'year'),
+}
+
+FACET_FIELDS = {'type': 'resource_type', 'year': 'year', 'source': 'source'}
+FACET_SIZE = 20
+# Facet counts are rebuilt in the background once older than this, and dropped after FACET_TIMEOUT * 12
+FACET_TIMEOUT = 300
+# Builds facet counts off the request path; one task per query text, deduplicated across workers
+FACET_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='facet-counts')
+
+def _facet_key(query):
+    return f"facets:{hashlib.md5(query.strip().lower().encode()).hexdigest()}"
+
+def _build_facets_in_background(query):
+    key = _facet_key(query)
+    try:
+        cache.set(key, {'built_at': time.time(), 'counts': list(ResourceService.facet_cube(query))}, FACET_TIMEOUT * 12)
+    except Exception as e:
+        print(f"⚠️ Facet counts failed: {e}")
+    finally:
+        connection.close()
+        cache.delete(key + ':building')
 
 class ResourceService:
     @staticmethod
-    def unified_search(query, filters=None, limit=20):
-        results = []
-        
-        # Search Koha - REAL DATA ONLY
-        try:
-            koha_results = KohaService.search_resources(query, limit//2 if query else limit//2)
-            for item in koha_results:
-                results.append({
-                    'id': f"koha_{item.get('biblio_id', '')}",
-                    'title': item.get('title', 'No Title'),
-                    'authors': item.get('author', ''),
-                    'source': 'koha',
-                    'source_name': 'Library Catalog',
-                    'external_id': str(item.get('biblio_id', '')),
-                    'resource_type': 'book',
-                    'year': item.get('copyright_date', ''),
-                    'description': item.get('abstract', ''),
-                    'url': f"http://127.0.0.1:8085/cgi-bin/koha/catalogue/detail.pl?biblionumber={item.get('biblio_id', '')}",
-                    'availability': 'Available'
-                })
-        except Exception as e:
-            print(f"Koha integration error: {e}")
-        
-        # Search DSpace - REAL DATA ONLY
-        try:
-            dspace_results = DSpaceService.search_resources(query, limit//2 if query else limit//2)
-            for item in dspace_results:
-                obj = item.get('_embedded', {}).get('indexableObject', {})
-                metadata = obj.get('metadata', {})
-                
-                # Extract authors
-                authors = []
-                for author_field in ['dc.contributor.author', 'dc.creator']:
-                    if author_field in metadata:
-                        authors.extend([m.get('value', '') for m in metadata[author_field]])
-                
-                # Extract description
-                description = ''
-                for desc_field in ['dc.description.abstract', 'dc.description']:
-                    if desc_field in metadata and metadata[desc_field]:
-                        description = metadata[desc_field][0].get('value', '')
-                        break
-                
-                # Extract year
-                year = ''
-                for date_field in ['dc.date.issued', 'dc.date.created']:
-                    if date_field in metadata and metadata[date_field]:
-                        year_value = metadata[date_field][0].get('value', '')
-                        if year_value:
-                            year = year_value[:4] if len(year_value) >= 4 else year_value
-                        break
-                
-                # Get handle or use UUID
-                handle = obj.get('handle', '')
-                uuid = obj.get('uuid', '')
-                dspace_url = f"http://localhost:4000/handle/{handle}" if handle else f"http://localhost:4000/items/{uuid}"
-                
-                results.append({
-                    'id': f"dspace_{uuid}",
-                    'title': obj.get('name', ''),
-                    'authors': ', '.join(authors),
-                    'source': 'dspace',
-                    'source_name': 'Research Repository',
-                    'external_id': handle or uuid,
-                    'resource_type': obj.get('type', 'document'),
-                    'year': year,
-                    'description': description,
-                    'url': dspace_url,
-                    'availability': 'Open Access'
-                })
-        except Exception as e:
-            print(f"DSpace integration error: {e}")
-        
-        # Search VuFind - REAL DATA ONLY
-        try:
-            vufind_results = VuFindService.search_resources(query, min(5, limit//4))
-            for item in vufind_results:
-                results.append({
-                    'id': f"vufind_{item.get('id', '')}",
-                    'title': item.get('title', ''),
-                    'authors': ', '.join(item.get('author', [])) if isinstance(item.get('author'), list) else item.get('author', ''),
-                    'source': 'vufind',
-                    'source_name': 'Discovery Layer',
-                    'external_id': item.get('id', ''),
-                    'resource_type': item.get('format', ['Unknown'])[0] if isinstance(item.get('format'), list) else item.get('format', 'Unknown'),
-                    'year': item.get('publishDate', [''])[0] if isinstance(item.get('publishDate'), list) else item.get('publishDate', ''),
-                    'description': item.get('summary', [''])[0] if isinstance(item.get('summary'), list) else item.get('summary', ''),
-                    'url': f"http://localhost:8090/Record/{item.get('id', '')}",
-                    'availability': 'Check Availability'
-                })
-        except Exception as e:
-            print(f"VuFind integration error: {e}")
-        
-        # Apply filters if provided
-        if filters:
-            if filters.get('source'):
-                results = [r for r in results if r['source'] == filters['source']]
-            if filters.get('type'):
-                results = [r for r in results if r['resource_type'] == filters['type']]
-            if filters.get('year'):
-                results = [r for r in results if str(r.get('year', '')) == str(filters['year'])]
-        
-        return results[:limit]
+    def source_accepts(source, filters):
+        """False when a source cannot have any hit passing ``filters``, so it is not queried"""
+        if filters.get('source') and filters['source'] != source:
+            return False
+        # Koha hits are always normalized as books
+        if source == 'koha' and filters.get('type') and filters['type'] != 'book':
+            return False
+        return True
+    
+    @staticmethod
+    def residual_filters(source, filters):
+        """The part of ``filters`` a source could not apply itself"""
+        pushed = FILTER_PUSHDOWN.get(source, ())
+        return {key: value for key, value in filters.items() if key not in pushed and key != 'source'}
+    
+    @staticmethod
+    def fetch_source_page(source, query, offset, limit, filters=None):
+        """Search one remote source - REAL DATA ONLY - from a continuation offset.
+        
+        Returns (results, tokens, next_offset): tokens[i] is the offset to resume
+        from right after results[i]; next_offset is None once the source is exhausted.
+        """
+        if source == 'koha':
+            biblios, next_offset = KohaService.search_page(query, offset, limit, filters)
+            results = list(map(project_koha, biblios))
+        elif source == 'dspace':
+            items, next_offset = DSpaceService.search_page(query, offset, limit, filters)
+            results = list(map(project_dspace, items))
+        elif source == 'vufind':
+            records, next_offset = VuFindService.search_page(query, offset, limit, filters)
+            results = list(map(project_vufind, records))
+        else:
+            raise ValueError(f"Unknown source: {source}")
+        
+        return results, list(range(offset + 1, offset + len(results) + 1)), next_offset
+    
+    @staticmethod
+    def local_query(query, filters=None, exclude=None):
+        """Q for the local Resource index, leaving out the ``exclude`` filter"""
+        filters = filters or {}
+        local_query = Q(title__icontains=query) | Q(description__icontains=query) | Q(authors__icontains=query)
+        for key, field in FACET_FIELDS.items():
+            if key != exclude and filters.get(key):
+                local_query &= Q(**{field: filters[key]})
+        return local_query
+    
+    @staticmethod
+    def fetch_local_page(query, filters=None, offset=0, limit=5):
+        """Search the local Resource index; same return shape as fetch_source_page"""
+        local_query = ResourceService.local_query(query, filters)
+        local_rows = Resource.objects.filter(local_query).order_by('-id').values(*LOCAL_FIELDS)[offset:offset + limit]
+        results = list(map(project_local, local_rows))
+        next_offset = offset + len(results) if len(results) == limit else None
+        return results, list(range(offset + 1, offset + len(results) + 1)), next_offset
+    
+    @staticmethod
+    def facet_cube(query):
+        """(source, resource_type, year, count) rows for the query text, ignoring filters.
+        
+        One GROUP BY over the three facet columns; every facet under any filter
+        selection is a sum over these rows, so one build serves them all.
+        """
+        rows = Resource.objects.all()
+        if query.strip():
+            rows = rows.filter(ResourceService.local_query(query.strip()))
+        return rows.values_list('source', 'resource_type', 'year').annotate(count=Count('id')).order_by()
+    
+    @staticmethod
+    def facet_counts(query, filters=None):
+        """Type/year/source counts from the local index, or None while they are built.
+        
+        Each facet is counted with every other active filter applied but not its
+        own, so the client can offer alternatives to the current selection. The
+        counts come from the cached facet_cube() of the query text; a miss or a
+        stale entry starts one background build and is served as is meanwhile.
+        """
+        filters = filters or {}
+        key = _facet_key(query)
+        entry = cache.get(key)
+        record_cache('facets', entry is not None)
+        
+        stale = entry is None or time.time() - entry['built_at'] > FACET_TIMEOUT
+        # cache.add is the cross-worker lock: one build per query text at a time
+        if stale and cache.add(key + ':building', 1, timeout=FACET_TIMEOUT):
+            FACET_EXECUTOR.submit(_build_facets_in_background, query)
+        if entry is None:
+            return None
+        
+        active = {name: str(filters[name]) for name in FACET_FIELDS if filters.get(name)}
+        columns = {'source': 0, 'type': 1, 'year': 2}
+        facets = {}
+        for name, column in columns.items():
+            totals = {}
+            for row in entry['counts']:
+                value = row[column]
+                if value is None or value == '':
+                    continue
+                if all(str(row[columns[other]]) == wanted for other, wanted in active.items() if other != name):
+                    totals[value] = totals.get(value, 0) + row[3]
+            ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+            facets[name] = [{'value': value, 'count': count} for value, count in ranked[:FACET_SIZE]]
+        return {name: facets[name] for name in FACET_FIELDS}
+    
+    @staticmethod
+    def lookup_source(source, external_ids):
+        """Fetch specific records from one remote source with a single request; {result id: SearchResult}"""
+        if source == 'koha':
+            results = list(map(project_koha, KohaRestAPI().get_biblios(external_ids)))
+        elif source == 'dspace':
+            results = list(map(project_dspace, RealDSpaceAPI().get_items(external_ids)))
+        elif source == 'vufind':
+            results = list(map(project_vufind, RealVuFindAPI().get_records(external_ids)))
+        else:
+            raise ValueError(f"Unknown source: {source}")
+        return {result.id: result for result in results}
+    
+    @staticmethod
+    def lookup_resources(ids, fields=None):
+        """Resolve local ids and koha_/dspace_/vufind_ prefixed ids.
+        
+        Local rows come from one in_bulk query (reading only ``fields`` when given)
+        while each remote source gets one grouped lookup in parallel. Returns
+        {requested id: Resource or SearchResult} for the ids that were found.
+        """
+        local_ids, remote_ids = [], {}
+        for resource_id in ids:
+            if resource_id.isdigit():
+                local_ids.append(int(resource_id))
+                continue
+            source, _, external_id = resource_id.partition('_')
+            if source in REMOTE_SOURCES and external_id:
+                remote_ids.setdefault(source, []).append(external_id)
+        
+        futures = {
+            SEARCH_EXECUTOR.submit(ResourceService.lookup_source, source, external_ids): source
+            for source, external_ids in remote_ids.items()
+        }
+        
+        resources = Resource.objects.all()
+        if fields:
+            columns = {field.name for field in Resource._meta.concrete_fields}
+            resources = resources.only(*[field for field in fields if field in columns])
+        found = {str(pk): resource for pk, resource in resources.in_bulk(local_ids).items()}
+        for future in as_completed(futures):
+            try:
+                found.update(future.result())
+            except Exception as e:
+                print(f"{futures[future]} lookup error: {e}")
+        return found
+    
+    @staticmethod
+    def result_matches(result, filters):
+        if filters.get('source') and result.source != filters['source']:
+            return False
+        if filters.get('type') and result.resource_type != filters['type']:
+            return False
+        if filters.get('year') and str(result.year) != str(filters['year']):
+            return False
+        return True
     
     @staticmethod
     def upload_to_dspace(file, metadata):
@@ -252,15 +377,9 @@ class ResourceService:
         }
     
     @staticmethod
-    def catalog_in_koha(metadata, dspace_url):
-        """Catalog item in real Koha with full metadata"""
-        koha_api = KohaRestAPI()
-        
-        if not koha_api.authenticate():
-            raise Exception("Koha authentication failed")
-        
-        # Prepare Koha metadata
-        koha_metadata = {
+    def koha_metadata(metadata, dspace_url=''):
+        """Map upload form metadata to the fields used by KohaRestAPI._convert_to_marc"""
+        return {
             'title': metadata['title'],
             'authors': metadata.get('authors', ''),
             'description': metadata.get('abstract') or metadata.get('description', ''),
@@ -275,15 +394,11 @@ class ResourceService:
             'citation': metadata.get('citation', ''),
             'sponsors': metadata.get('sponsors', '')
         }
-        
-        biblio = koha_api.create_biblio(koha_metadata)
-        if not biblio:
-            raise Exception("Failed to create Koha bibliographic record")
-        
-        biblio_id = biblio.get('id')
-        
-        # Add digital item
-        item_data = {
+    
+    @staticmethod
+    def koha_item_data(biblio_id, metadata, dspace_url=''):
+        """Build the digital item attached to a freshly catalogued biblio"""
+        return {
             "external_id": f"DSPACE-{biblio_id}",
             "barcode": f"DIGITAL-{biblio_id}",
             "homebranch": "CPL",
@@ -294,8 +409,26 @@ class ResourceService:
             "itemnotes": f"Digital version: {dspace_url}",
             "uri": dspace_url
         }
+    
+    @staticmethod
+    def catalog_in_koha(metadata, dspace_url):
+        """Catalog item in real Koha with full metadata"""
+        koha_api = KohaRestAPI()
+        
+        if not koha_api.authenticate():
+            raise Exception("Koha authentication failed")
         
-        koha_api.add_item(biblio_id, item_data)
+        # Prepare Koha metadata
+        koha_metadata = ResourceService.koha_metadata(metadata, dspace_url)
+        
+        biblio = koha_api.create_biblio(koha_metadata)
+        if not biblio:
+            raise Exception("Failed to create Koha bibliographic record")
+        
+        biblio_id = biblio.get('id')
+        
+        # Add digital item
+        koha_api.add_item(biblio_id, ResourceService.koha_item_data(biblio_id, metadata, dspace_url))
         
         return {
             'biblio_id': biblio_id,
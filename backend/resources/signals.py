@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .caching import bump_version
+from .models import Resource
+
+
+@receiver([post_save, post_delete], sender=Resource)
+def resource_changed(sender, instance, **kwargs):
+    namespaces = ('resources', f'resource:{instance.pk}')
+    transaction.on_commit(lambda: bump_version(*namespaces))
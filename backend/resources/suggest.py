@@ -0,0 +1,270 @@
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from django.db import connection
+from django.db.models import Count, Max
+from .models import Resource, SearchLog
+
+# Seconds between background refreshes, and between full rebuilds that drop deleted rows
+REFRESH_INTERVAL = 30
+FULL_REBUILD_INTERVAL = 3600
+
+# A title is also reachable from its second..Nth word ("history" finds "Ethiopian history")
+MAX_WORD_OFFSETS = 6
+# Prefix matches examined per lookup; prefixes with more get weight-ordered candidates at build time
+MAX_SCAN = 500
+MIN_QUERY_COUNT = 2
+MAX_QUERIES = 5000
+# Changed entries a refresh merges into the previous index; past this it sorts a new one
+MAX_MERGE = 2000
+
+SPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize(text):
+    return SPACE_PATTERN.sub(' ', str(text or '').lower()).strip()
+
+
+def word_tails(text):
+    """The text itself plus the text starting at each of its next few words"""
+    tails = [text]
+    start = 0
+    for _ in range(MAX_WORD_OFFSETS - 1):
+        start = text.find(' ', start) + 1
+        if not start:
+            break
+        tails.append(text[start:])
+    return tails
+
+
+def next_prefix(prefix):
+    """Smallest string sorting after every string that starts with ``prefix``"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def index_pairs(entries):
+    """(key, entry) for every lookup key of every entry"""
+    return [
+        (key, entry)
+        for entry in entries
+        for key in word_tails(normalize(entry[1]))
+        if key
+    ]
+
+
+def best_entries(entries):
+    """Distinct suggestions of ``entries``, heaviest first, at most MAX_SCAN of them"""
+    best = {}
+    for entry in entries:
+        identity = (entry[2], normalize(entry[1]))
+        if identity not in best or entry[0] > best[identity][0]:
+            best[identity] = entry
+    return heapq.nlargest(MAX_SCAN, best.values(), key=lambda entry: entry[0])
+
+
+class SuggestIndex:
+    """Immutable sorted array of normalized keys, searched with bisect.
+
+    ``keys[i]`` is the lookup string and ``entries[i]`` the (weight, text,
+    kind, resource_id) suggestion it leads to. A prefix matching more than
+    MAX_SCAN keys (short ones like "h") gets its candidates precomputed in
+    ``heavy``, ordered by weight, so the cap never drops the best matches;
+    every other prefix matches few enough keys to scan them all. A refresh
+    builds a new index (see merged()) and swaps it in whole, so readers never
+    need a lock.
+    """
+
+    def __init__(self, items=()):
+        pairs = sorted(index_pairs(items))
+        self.keys = [key for key, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+        self.heavy = self.heavy_prefixes()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def heavy_prefixes(self):
+        """{prefix: best entries} for every prefix matching more than MAX_SCAN keys.
+
+        A longer prefix matches a subrange of a shorter one, so only the
+        ranges of heavy prefixes are split one character further.
+        """
+        keys, heavy = self.keys, {}
+        spans = [(0, len(keys), 0)]
+        while spans:
+            low, high, depth = spans.pop()
+            position = low
+            while position < high:
+                if len(keys[position]) <= depth:
+                    position += 1
+                    continue
+                prefix = keys[position][:depth + 1]
+                end = bisect_left(keys, next_prefix(prefix), position, high)
+                if end - position > MAX_SCAN:
+                    heavy[prefix] = best_entries(self.entries[position:end])
+                    spans.append((position, end, depth + 1))
+                position = end
+        return heavy
+
+    def merged(self, removed, added):
+        """Copy of this index without the ``removed`` entries and with ``added`` ones.
+
+        Only the changed keys are moved in the copied arrays, and only the
+        prefixes of changed keys are checked for heavy candidates; a heavy
+        list none of the removed entries was in just takes the added ones in.
+        """
+        removed_pairs, added_pairs = index_pairs(removed), index_pairs(added)
+        keys, entries = list(self.keys), list(self.entries)
+        for key, entry in removed_pairs:
+            position = bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key:
+                if entries[position] == entry:
+                    del keys[position], entries[position]
+                    break
+                position += 1
+        for key, entry in added_pairs:
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            entries.insert(position, entry)
+
+        index = SuggestIndex.__new__(SuggestIndex)
+        index.keys, index.entries, index.heavy = keys, entries, dict(self.heavy)
+        removed = set(removed)
+        checked = {}
+        for changed in {key for key, _ in removed_pairs + added_pairs}:
+            for depth in range(1, len(changed) + 1):
+                prefix = changed[:depth]
+                if prefix not in checked:
+                    checked[prefix] = index.update_heavy(prefix, removed, added_pairs)
+                if not checked[prefix]:
+                    # Longer prefixes match a subrange, so none of them is heavy either
+                    for longer in range(depth + 1, len(changed) + 1):
+                        index.heavy.pop(changed[:longer], None)
+                    break
+        return index
+
+    def update_heavy(self, prefix, removed, added_pairs):
+        """Refresh ``heavy[prefix]`` after a merge; False once ``prefix`` is not heavy"""
+        position = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, next_prefix(prefix), position)
+        if end - position <= MAX_SCAN:
+            self.heavy.pop(prefix, None)
+            return False
+        previous = self.heavy.get(prefix)
+        if previous is not None and removed.isdisjoint(previous):
+            self.heavy[prefix] = best_entries(
+                previous + [entry for key, entry in added_pairs if key.startswith(prefix)]
+            )
+        else:
+            self.heavy[prefix] = best_entries(self.entries[position:end])
+        return True
+
+    def lookup(self, prefix, limit=8):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        if prefix in self.heavy:
+            top = self.heavy[prefix][:limit]
+        else:
+            position = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, next_prefix(prefix), position, min(len(self.keys), position + MAX_SCAN))
+            top = best_entries(self.entries[position:end])[:limit]
+        return [
+            {'text': text, 'type': kind, 'id': resource_id}
+            for _, text, kind, resource_id in top
+        ]
+
+
+class SuggestBuilder:
+    """Keeps the rows behind the index and folds in changes since the last refresh"""
+
+    def __init__(self):
+        self.resources = {}
+        self.queries = Counter()
+        self.popular = []
+        self.resource_mark = None
+        self.log_mark = 0
+        self.full_at = 0
+        self.index = None
+
+    def refresh(self):
+        """Index with the changes since the last call; the same index when nothing changed"""
+        if time.time() - self.full_at > FULL_REBUILD_INTERVAL:
+            self.resources, self.queries, self.popular = {}, Counter(), []
+            self.resource_mark, self.log_mark = None, 0
+            self.full_at = time.time()
+            self.index = None
+
+        removed, added = [], []
+        rows = Resource.objects.all()
+        if self.resource_mark is not None:
+            rows = rows.filter(updated_at__gte=self.resource_mark)
+        for row in rows.values('id', 'title', 'authors', 'view_count', 'download_count', 'updated_at').iterator():
+            weight = 1 + math.log1p(row['view_count'] + row['download_count'])
+            items = [(weight + 1, row['title'], 'title', row['id'])]
+            items += [(weight, author.strip(), 'author', None) for author in row['authors'].split(',') if author.strip()]
+            # The newest row is read again by the next refresh (updated_at >= mark)
+            previous = self.resources.get(row['id'], [])
+            if items != previous:
+                removed += previous
+                added += items
+                self.resources[row['id']] = items
+            if self.resource_mark is None or row['updated_at'] > self.resource_mark:
+                self.resource_mark = row['updated_at']
+
+        logs = SearchLog.objects.filter(id__gt=self.log_mark).exclude(query='')
+        latest = logs.aggregate(latest=Max('id'))['latest']
+        if latest:
+            for row in logs.filter(id__lte=latest).values('query').annotate(count=Count('id')):
+                self.queries[normalize(row['query'])] += row['count']
+            self.log_mark = latest
+
+            popular = [
+                (1 + math.log(count), query, 'query', None)
+                for query, count in self.queries.most_common(MAX_QUERIES)
+                if count >= MIN_QUERY_COUNT
+            ]
+            removed += list(set(self.popular) - set(popular))
+            added += list(set(popular) - set(self.popular))
+            self.popular = popular
+
+        if self.index is None or len(removed) + len(added) > MAX_MERGE:
+            self.index = SuggestIndex([item for items in self.resources.values() for item in items] + self.popular)
+        elif removed or added:
+            self.index = self.index.merged(removed, added)
+        return self.index
+
+
+EMPTY_INDEX = SuggestIndex()
+_builder = SuggestBuilder()
+_index = None
+_refreshed_at = 0
+_refresh_lock = threading.Lock()
+
+
+def _refresh():
+    global _index, _refreshed_at
+    try:
+        _index = _builder.refresh()
+    except Exception as e:
+        print(f"⚠️ Suggest index refresh failed: {e}")
+    finally:
+        _refreshed_at = time.time()
+        connection.close()
+        _refresh_lock.release()
+
+
+def get_index():
+    """Current index, refreshed in the background; empty until the first build finishes"""
+    if time.time() - _refreshed_at > REFRESH_INTERVAL and _refresh_lock.acquire(blocking=False):
+        threading.Thread(target=_refresh, daemon=True, name='suggest-refresh').start()
+    return _index or EMPTY_INDEX
+
+
+def suggest(prefix, limit=8):
+    return get_index().lookup(prefix, limit)
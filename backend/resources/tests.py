@@ -1,3 +1,71 @@
+import re
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
 from django.test import TestCase
+from django.utils import timezone
+from .models import Resource, SearchLog, DownloadLog, UploadedFile
+from .pagination import encode_position, keyset_queryset
+from .services import ResourceService
 
-# Create your tests here.
+# "SCAN resources_resource" without "USING ... INDEX" is a full table scan in SQLite's plan output
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b.*\bINDEX\b)')
+
+
+class HotQueryPlanTests(TestCase):
+    """EXPLAIN the queries behind search, listings and analytics; none may scan a whole table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('reader', 'reader@example.com', 'secret')
+        resource = Resource.objects.create(
+            title='Coffee history', source='koha', external_id='1', resource_type='book', year=2020, download_count=3
+        )
+        SearchLog.objects.create(user=cls.user, query='coffee', results_count=0)
+        DownloadLog.objects.create(user=cls.user, resource=resource)
+        UploadedFile.objects.create(title='Notes', user=cls.user, file='uploads/notes.pdf')
+
+    def assertIndexed(self, queryset):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plan format checked here is SQLite specific')
+        plan = queryset.explain()
+        scans = [match.group(1) for match in FULL_SCAN.finditer(plan)]
+        self.assertEqual(scans, [], f'Full table scan in plan:\n{plan}\nfor query:\n{queryset.query}')
+
+    def test_search_filters(self):
+        filters = {'source': 'koha', 'type': 'book', 'year': '2020'}
+        for keys in (('source', 'type', 'year'), ('type', 'year'), ('type',), ('year',)):
+            subset = {key: filters[key] for key in keys}
+            with self.subTest(filters=subset):
+                self.assertIndexed(
+                    Resource.objects.filter(ResourceService.local_query('coffee', subset)).order_by('-id')[:5]
+                )
+
+    def test_facet_counts(self):
+        for text in ('', 'coffee'):
+            with self.subTest(query=text):
+                self.assertIndexed(ResourceService.facet_cube(text))
+
+    def test_recent_resources(self):
+        self.assertIndexed(Resource.objects.order_by('-created_at')[:10])
+
+    def test_popular_resources(self):
+        self.assertIndexed(Resource.objects.filter(download_count__gt=0).order_by('-download_count')[:10])
+
+    def test_suggest_refresh(self):
+        self.assertIndexed(Resource.objects.filter(updated_at__gte=timezone.now()).values('id', 'title'))
+
+    def test_analytics_ranges(self):
+        start = timezone.now() - timedelta(days=30)
+        self.assertIndexed(
+            SearchLog.objects.filter(timestamp__gte=start).values('query').annotate(count=Count('id'))
+        )
+        self.assertIndexed(DownloadLog.objects.filter(timestamp__gte=start).values('id'))
+
+    def test_keyset_listings(self):
+        cursor = encode_position(timezone.now(), 10)
+        downloads = DownloadLog.objects.filter(user=self.user).select_related('resource')
+        self.assertIndexed(keyset_queryset(downloads, 'timestamp', cursor)[:21])
+        files = UploadedFile.objects.filter(user=self.user, title__icontains='notes')
+        self.assertIndexed(keyset_queryset(files, 'created_at', cursor)[:21])
@@ -3,6 +3,9 @@ from . import views, test_views, bulk_views
 
 urlpatterns = [
     path('search/', views.search_resources, name='search_resources'),
+    path('search/stream/', views.search_resources_stream, name='search_resources_stream'),
+    path('suggest/', views.suggest_resources, name='suggest_resources'),
+    path('batch/', views.batch_resources, name='batch_resources'),
     path('recent/', views.recent_resources, name='recent_resources'),
     path('downloads/', views.user_downloads, name='user_downloads'),
     path('upload/', views.upload_resource, name='upload_resource'),
@@ -1,34 +1,34 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.views.decorators.cache import cache_control
 from .models import Resource, SearchLog, DownloadLog, UploadedFile
-from .serializers import ResourceSerializer, DownloadLogSerializer, UploadedFileSerializer
+from .serializers import (
+    ResourceSerializer, ResourceListSerializer, DownloadLogSerializer, UploadedFileSerializer,
+    RESOURCE_LIST_FIELDS, sparse_fields
+)
 from .services import ResourceService
+from .federated import FederatedSearch, InvalidCursor
+from .identifiers import register_work, normalize_issn, title_year_key
+from .suggest import suggest
+from .pagination import InvalidPageCursor, keyset_page, page_limit, paginated_response
+from .renderers import EventStreamRenderer, JSONRenderer
+from .caching import cached_view, search_etag, recent_etag, resource_etag
+from analytics.sketches import record_search, record_download
+from analytics.telemetry import record_search_timing
 import os
 import json
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def search_resources(request):
+def _search_params(request):
     query = request.GET.get('q', '')
     source = request.GET.get('source', '')
     resource_type = request.GET.get('type', '')
     year = request.GET.get('year', '')
     limit = int(request.GET.get('limit', 20))
     
-    # Allow empty query to return all items
-    if not query:
-        query = ''  # Empty query will return all items from each system
-    
-    # Log search
-    SearchLog.objects.create(
-        user=request.user if request.user.is_authenticated else None,
-        query=query,
-        results_count=0
-    )
-    
     # Build filters
     filters = {}
     if source:
@@ -38,73 +38,178 @@ def search_resources(request):
     if year:
         filters['year'] = year
     
-    # Get unified results from external APIs
-    results = ResourceService.unified_search(query, filters, limit)
-    
-    # Search local database
-    local_query = Q(title__icontains=query) | Q(description__icontains=query) | Q(authors__icontains=query)
-    if source and source != '':
-        local_query &= Q(source=source)
-    if resource_type and resource_type != '':
-        local_query &= Q(resource_type=resource_type)
-    if year and year != '':
-        local_query &= Q(year=year)
-    
-    local_resources = Resource.objects.filter(local_query)[:limit//4]
-    local_results = []
-    
-    for resource in local_resources:
-        local_results.append({
-            'id': resource.id,
-            'title': resource.title,
-            'authors': resource.authors,
-            'source': resource.source,
-            'source_name': 'Local Repository' if resource.source == 'local' else 'DSpace Repository',
-            'external_id': resource.external_id,
-            'resource_type': resource.resource_type,
-            'year': resource.year,
-            'description': resource.description,
-            'url': resource.view_url or f'/api/resources/{resource.id}/preview/',
-            'download_url': resource.download_url,
-            'availability': 'Available'
-        })
-    
+    return query, filters, limit
+
+def _search_payload(results, local_results, query, filters, next_cursor=None, first_page=True):
     # Combine results
     all_results = results + local_results
     
-    # Group results by source for better presentation
-    grouped_results = {
+    # Group results by source as indexes into the single results array
+    groups = {
         'koha': [],
         'dspace': [],
         'vufind': [],
-        'local': local_results
+        'local': []
     }
     
-    for result in results:
-        source_key = result.get('source', 'unknown')
-        if source_key in grouped_results:
-            grouped_results[source_key].append(result)
-        else:
-            # Handle any other sources
-            if source_key not in grouped_results:
-                grouped_results[source_key] = []
-            grouped_results[source_key].append(result)
+    for index, result in enumerate(results):
+        groups.setdefault(result.source, []).append(index)
     
-    return Response({
+    groups['local'] = list(range(len(results), len(all_results)))
+    
+    return {
         'results': all_results,
-        'grouped': grouped_results,
+        'groups': groups,
         'total': len(all_results),
         'query': query,
-        'filters': filters
+        'filters': filters,
+        # Facets describe the whole result set, so later pages leave them out
+        'facets': ResourceService.facet_counts(query, filters) if first_page else None,
+        'next_cursor': next_cursor
+    }
+
+def _log_search(request, query, results_count):
+    SearchLog.objects.create(
+        user=request.user if request.user.is_authenticated else None,
+        query=query,
+        results_count=results_count
+    )
+    record_search(query)
+
+def _federated_search(request):
+    query, filters, limit = _search_params(request)
+    cursor = request.GET.get('cursor', '')
+    
+    return FederatedSearch(query, filters, limit, cursor)
+
+def _finish_search(request, search, payload):
+    # Only the first page is a new search
+    if not request.GET.get('cursor'):
+        _log_search(request, search.query, payload['total'])
+    record_search_timing(search.timings, search.elapsed_ms())
+
+@cached_view(search_etag, max_age=30)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_resources(request):
+    # Empty query returns all items from each system
+    try:
+        search = _federated_search(request)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=400)
+    
+    # Remote requests run while the local index is queried
+    search.start()
+    local_results = search.fetch_local()
+    results, next_cursor = search.page()
+    
+    payload = _search_payload(
+        results, local_results, search.query, search.filters, next_cursor, not request.GET.get('cursor')
+    )
+    _finish_search(request, search, payload)
+    return Response(payload)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def search_resources_stream(request):
+    """Server-sent events: local hits first, then one event per source as it answers, then the merged page"""
+    try:
+        search = _federated_search(request)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=400)
+    
+    renderer = JSONRenderer()
+    
+    def event(name, data):
+        return b'event: ' + name.encode() + b'\ndata: ' + renderer.render(data) + b'\n\n'
+    
+    def events():
+        # Remote requests are already in flight while the local index is queried
+        search.start()
+        
+        local_results = search.fetch_local()
+        yield event('local', {'source': 'local', 'results': local_results})
+        
+        for source, results in search.iter_remote():
+            yield event('source', {'source': source, 'results': results})
+        
+        results, next_cursor = search.page()
+        payload = _search_payload(
+            results, local_results, search.query, search.filters, next_cursor, not request.GET.get('cursor')
+        )
+        _finish_search(request, search, payload)
+        yield event('done', payload)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@cache_control(public=True, max_age=60)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def suggest_resources(request):
+    query = request.GET.get('q', '')
+    limit = page_limit(request, default=8, maximum=20)
+    
+    return Response({
+        'query': query,
+        'suggestions': suggest(query, limit)
+    })
+
+BATCH_MAX_IDS = 200
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def batch_resources(request):
+    """Several resources in one round trip: ?ids=1,2,koha_5 or POST {"ids": [...]}, optional fields="""
+    if request.method == 'POST':
+        ids = request.data.get('ids', [])
+        fields = request.data.get('fields') or request.GET.get('fields', '')
+    else:
+        ids = request.GET.get('ids', '').split(',')
+        fields = request.GET.get('fields', '')
+    
+    if not isinstance(ids, list):
+        return Response({'error': 'ids must be a list'}, status=400)
+    
+    ids = list(dict.fromkeys(str(resource_id).strip() for resource_id in ids if str(resource_id).strip()))
+    if len(ids) > BATCH_MAX_IDS:
+        return Response({'error': f'At most {BATCH_MAX_IDS} ids per request'}, status=400)
+    
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    
+    found = ResourceService.lookup_resources(ids, fields or None)
+    
+    results = []
+    for resource_id in ids:
+        item = found.get(resource_id)
+        if item is None:
+            results.append(None)
+        elif isinstance(item, Resource):
+            results.append(ResourceSerializer(item, fields=fields or None).data)
+        else:
+            data = item.to_dict()
+            results.append({key: data[key] for key in fields if key in data} if fields else data)
+    
+    return Response({
+        'results': results,
+        'missing': [resource_id for resource_id in ids if resource_id not in found]
     })
 
+# Weak: the tag does not follow view_count, which changes on every request
+@cached_view(resource_etag, max_age=60, weak=True)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_resource(request, resource_id):
     try:
         resource = Resource.objects.get(id=resource_id)
+        # Counter-only update: no full-row save, and the cached version (ETag) stays valid
+        Resource.objects.filter(id=resource_id).update(view_count=F('view_count') + 1)
         resource.view_count += 1
-        resource.save()
         return Response(ResourceSerializer(resource).data)
     except Resource.DoesNotExist:
         return Response({'error': 'Resource not found'}, status=404)
@@ -113,11 +218,12 @@ def get_resource(request, resource_id):
 def download_resource(request, resource_id):
     try:
         resource = Resource.objects.get(id=resource_id)
-        resource.download_count += 1
-        resource.save()
+        # Counter-only update, as in get_resource: a full save would bump the cache version
+        Resource.objects.filter(id=resource_id).update(download_count=F('download_count') + 1)
         
         if request.user.is_authenticated:
             DownloadLog.objects.create(user=request.user, resource=resource)
+            record_download(resource.id)
         
         # Handle local files
         if resource.source == 'local' and resource.download_url:
@@ -157,11 +263,14 @@ def download_resource(request, resource_id):
     except Resource.DoesNotExist:
         return Response({'error': 'Resource not found'}, status=404)
 
+@cached_view(recent_etag, max_age=30)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def recent_resources(request):
-    resources = Resource.objects.order_by('-created_at')[:10]
-    return Response(ResourceSerializer(resources, many=True).data)
+    fields = sparse_fields(request, RESOURCE_LIST_FIELDS, ResourceListSerializer.Meta.fields)
+    # values() reads only the requested columns; metadata JSON is not decoded unless asked for
+    resources = Resource.objects.order_by('-created_at').values(*fields)[:10]
+    return Response(ResourceListSerializer(resources, many=True, fields=fields).data)
 
 @api_view(['GET'])
 def user_downloads(request):
@@ -169,8 +278,17 @@ def user_downloads(request):
         return Response({'error': 'Authentication required'}, status=401)
     
     try:
-        downloads = DownloadLog.objects.filter(user=request.user).order_by('-timestamp')[:20]
-        return Response(DownloadLogSerializer(downloads, many=True).data)
+        fields = sparse_fields(request, DownloadLogSerializer.Meta.fields, DownloadLogSerializer.Meta.fields)
+        downloads = DownloadLog.objects.filter(user=request.user)
+        if 'resource_title' in fields:
+            # One join instead of a resource query per row
+            downloads = downloads.select_related('resource')
+        downloads = downloads.only('timestamp', *[DownloadLogSerializer.COLUMNS[field] for field in fields])
+        
+        downloads, next_cursor = keyset_page(downloads, 'timestamp', request.GET.get('cursor'), page_limit(request))
+        return paginated_response(request, DownloadLogSerializer(downloads, many=True, fields=fields).data, next_cursor)
+    except InvalidPageCursor as e:
+        return Response({'error': str(e)}, status=400)
     except Exception as e:
         return Response({'downloads': [], 'message': 'No downloads found'})
 
@@ -248,6 +366,19 @@ def upload_resource(request):
             }
         )
         
+        # One work in three systems: record its identifiers so search can collapse the copies
+        try:
+            register_work([
+                ('dspace_uuid', dspace_result.get('uuid')),
+                ('dspace_handle', dspace_result.get('handle')),
+                ('koha_biblio', koha_result.get('biblio_id')),
+                ('vufind_id', dspace_result.get('uuid') if vufind_indexed else ''),
+                ('issn', normalize_issn(metadata['issn'])),
+                ('title_year', title_year_key(metadata['title'], metadata['date_year'])),
+            ], resource)
+        except Exception as e:
+            print(f"⚠️ Identifier registration failed: {e}")
+        
         print(f"✅ Successfully integrated '{metadata['title']}' across all systems")
         
         return Response({
@@ -342,13 +473,24 @@ def upload_file(request):
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+def _uploaded_files_page(request, files, default_limit=20):
+    fields = sparse_fields(request, UploadedFileSerializer.Meta.fields, UploadedFileSerializer.Meta.fields)
+    files = files.only('created_at', *[UploadedFileSerializer.COLUMNS[field] for field in fields])
+    
+    try:
+        files, next_cursor = keyset_page(files, 'created_at', request.GET.get('cursor'), page_limit(request, default_limit))
+    except InvalidPageCursor as e:
+        return Response({'error': str(e)}, status=400)
+    
+    return paginated_response(request, UploadedFileSerializer(files, many=True, fields=fields).data, next_cursor)
+
 @api_view(['GET'])
 def list_uploaded_files(request):
     if not request.user.is_authenticated:
         return Response({'error': 'Authentication required'}, status=401)
     
-    files = UploadedFile.objects.filter(user=request.user).order_by('-created_at')
-    return Response(UploadedFileSerializer(files, many=True).data)
+    files = UploadedFile.objects.filter(user=request.user)
+    return _uploaded_files_page(request, files, default_limit=50)
 
 @api_view(['GET'])
 def search_uploaded_files(request):
@@ -356,12 +498,8 @@ def search_uploaded_files(request):
         return Response({'error': 'Authentication required'}, status=401)
     
     query = request.GET.get('q', '')
-    if not query:
-        files = UploadedFile.objects.filter(user=request.user).order_by('-created_at')[:20]
-    else:
-        files = UploadedFile.objects.filter(
-            user=request.user,
-            title__icontains=query
-        ).order_by('-created_at')[:20]
+    files = UploadedFile.objects.filter(user=request.user)
+    if query:
+        files = files.filter(title__icontains=query)
     
-    return Response(UploadedFileSerializer(files, many=True).data)
\ No newline at end of file
+    return _uploaded_files_page(request, files)
\ No newline at end of file
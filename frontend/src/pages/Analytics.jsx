@@ -13,22 +13,28 @@ const Analytics = () => {
   const [timeRange, setTimeRange] = useState(30);
 
   useEffect(() => {
+    let retry;
+    const fetchAnalytics = async () => {
+      try {
+        const response = await axios.get(`/api/analytics/dashboard/?days=${timeRange}`);
+        // 202: the server is still building this range; ask again shortly
+        if (response.data.pending) {
+          retry = setTimeout(fetchAnalytics, 2000);
+          return;
+        }
+        setData(response.data);
+      } catch (error) {
+        console.error('Analytics error:', error);
+      }
+      setLoading(false);
+    };
+
     if (user?.role === 'admin') {
       fetchAnalytics();
     }
+    return () => clearTimeout(retry);
   }, [user, timeRange]);
 
-  const fetchAnalytics = async () => {
-    try {
-      const response = await axios.get(`/api/analytics/dashboard/?days=${timeRange}`);
-      setData(response.data);
-    } catch (error) {
-      console.error('Analytics error:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   if (user?.role !== 'admin') {
     return (
       <div className="max-w-7xl mx-auto px-4 py-8">
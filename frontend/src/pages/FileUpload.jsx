@@ -13,6 +13,9 @@ const FileUpload = () => {
   const [uploadedFiles, setUploadedFiles] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState([]);
+  // Cursors of the next page of each list; null once it is complete
+  const [filesCursor, setFilesCursor] = useState(null);
+  const [searchCursor, setSearchCursor] = useState(null);
 
   const handleInputChange = (e) => {
     setFormData(prev => ({
@@ -62,34 +65,43 @@ const FileUpload = () => {
     }
   };
 
-  const fetchUploadedFiles = async () => {
+  // Both lists come a page at a time; X-Next-Cursor is set while more pages remain
+  const fetchUploadedFiles = async (cursor = null) => {
     try {
-      const response = await fetch('http://localhost:8000/api/resources/uploaded-files/', {
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`http://localhost:8000/api/resources/uploaded-files/${params}`, {
         credentials: 'include'
       });
       if (response.ok) {
         const files = await response.json();
-        setUploadedFiles(files);
+        setUploadedFiles(prev => (cursor ? [...prev, ...files] : files));
+        setFilesCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Error fetching files:', error);
     }
   };
 
-  const handleSearch = async () => {
+  const handleSearch = async (cursor = null) => {
     try {
-      const response = await fetch(`http://localhost:8000/api/resources/search-files/?q=${encodeURIComponent(searchQuery)}`, {
+      const params = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`http://localhost:8000/api/resources/search-files/?q=${encodeURIComponent(searchQuery)}${params}`, {
         credentials: 'include'
       });
       if (response.ok) {
         const results = await response.json();
-        setSearchResults(results);
+        setSearchResults(prev => (cursor ? [...prev, ...results] : results));
+        setSearchCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Search error:', error);
     }
   };
 
+  const showingSearch = searchResults.length > 0;
+  const nextCursor = showingSearch ? searchCursor : filesCursor;
+  const loadMore = () => (showingSearch ? handleSearch(searchCursor) : fetchUploadedFiles(filesCursor));
+
   return (
     <div className="max-w-6xl mx-auto px-4 py-8">
       <h1 className="text-3xl font-bold mb-8">File Upload & Management</h1>
@@ -161,13 +173,13 @@ const FileUpload = () => {
               placeholder="Search files..."
               className="flex-1 p-3 border border-gray-300 rounded-lg focus:outline-none focus:border-[#4A70A9]"
             />
-            <Button onClick={handleSearch}>
+            <Button onClick={() => handleSearch()}>
               <Search className="w-4 h-4" />
             </Button>
           </div>
           
           <div className="space-y-3 max-h-96 overflow-y-auto">
-            {(searchResults.length > 0 ? searchResults : uploadedFiles).map(file => (
+            {(showingSearch ? searchResults : uploadedFiles).map(file => (
               <div key={file.id} className="p-3 border border-gray-200 rounded-lg">
                 <h3 className="font-medium">{file.title}</h3>
                 <p className="text-sm text-gray-600">{file.description}</p>
@@ -189,9 +201,14 @@ const FileUpload = () => {
             {uploadedFiles.length === 0 && searchResults.length === 0 && (
               <p className="text-gray-500 text-center py-8">No files found</p>
             )}
+            {nextCursor && (
+              <Button onClick={loadMore} variant="secondary" size="sm" className="w-full">
+                Load more
+              </Button>
+            )}
           </div>
           
-          <Button onClick={fetchUploadedFiles} variant="secondary" className="w-full mt-4">
+          <Button onClick={() => fetchUploadedFiles()} variant="secondary" className="w-full mt-4">
             Refresh Files
           </Button>
         </Card>
@@ -24,6 +24,9 @@ const IntegratedUpload = () => {
   const [uploadedFiles, setUploadedFiles] = useState([]);
   const [dspaceItems, setDspaceItems] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  // The Django list comes a page at a time: the cursor of the next page and the search it continues (null when listing)
+  const [filesCursor, setFilesCursor] = useState(null);
+  const [searchedQuery, setSearchedQuery] = useState(null);
 
   useEffect(() => {
     checkDSpaceAuth();
@@ -63,14 +66,17 @@ const IntegratedUpload = () => {
     setDspaceItems(items);
   };
 
-  const fetchUploadedFiles = async () => {
+  const fetchUploadedFiles = async (cursor = null) => {
     try {
-      const response = await fetch('http://localhost:8000/api/resources/uploaded-files/', {
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`http://localhost:8000/api/resources/uploaded-files/${params}`, {
         credentials: 'include'
       });
       if (response.ok) {
         const files = await response.json();
-        setUploadedFiles(files);
+        setUploadedFiles(prev => (cursor ? [...prev, ...files] : files));
+        setFilesCursor(response.headers.get('X-Next-Cursor'));
+        setSearchedQuery(null);
       }
     } catch (error) {
       console.error('Error fetching files:', error);
@@ -154,14 +160,18 @@ const IntegratedUpload = () => {
     }
   };
 
-  const handleSearch = async () => {
+  const handleSearch = async (cursor = null) => {
+    const query = cursor ? searchedQuery : searchQuery;
     try {
-      const response = await fetch(`http://localhost:8000/api/resources/search-files/?q=${encodeURIComponent(searchQuery)}`, {
+      const params = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`http://localhost:8000/api/resources/search-files/?q=${encodeURIComponent(query)}${params}`, {
         credentials: 'include'
       });
       if (response.ok) {
         const results = await response.json();
-        setUploadedFiles(results);
+        setUploadedFiles(prev => (cursor ? [...prev, ...results] : results));
+        setFilesCursor(response.headers.get('X-Next-Cursor'));
+        setSearchedQuery(query);
       }
     } catch (error) {
       console.error('Search error:', error);
@@ -344,7 +354,7 @@ const IntegratedUpload = () => {
               placeholder="Search files..."
               className="flex-1 p-3 border border-gray-300 rounded-lg focus:outline-none focus:border-[#4A70A9]"
             />
-            <Button onClick={handleSearch}>
+            <Button onClick={() => handleSearch()}>
               <Search className="w-4 h-4" />
             </Button>
           </div>
@@ -358,6 +368,16 @@ const IntegratedUpload = () => {
                 <p className="text-xs text-gray-500">Django • {new Date(file.created_at).toLocaleDateString()}</p>
               </div>
             ))}
+            {filesCursor && (
+              <Button
+                onClick={() => (searchedQuery !== null ? handleSearch(filesCursor) : fetchUploadedFiles(filesCursor))}
+                variant="secondary"
+                size="sm"
+                className="w-full"
+              >
+                Load more
+              </Button>
+            )}
             
             <h3 className="font-semibold text-sm text-gray-700 mt-4">DSpace Items</h3>
             {dspaceItems.map(item => (
@@ -9,6 +9,8 @@ import Button from '../components/UI/Button';
 const Profile = () => {
   const { user } = useAuth();
   const [downloads, setDownloads] = useState([]);
+  // Cursor of the next page of downloads; null once the history is complete
+  const [downloadsCursor, setDownloadsCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [uploading, setUploading] = useState(false);
   const [uploadForm, setUploadForm] = useState({
@@ -30,6 +32,7 @@ const Profile = () => {
     try {
       const downloadsResponse = await axios.get('/api/resources/downloads/');
       setDownloads(downloadsResponse.data);
+      setDownloadsCursor(downloadsResponse.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching user data:', error);
     } finally {
@@ -37,6 +40,16 @@ const Profile = () => {
     }
   };
 
+  const fetchMoreDownloads = async () => {
+    try {
+      const response = await axios.get('/api/resources/downloads/', { params: { cursor: downloadsCursor } });
+      setDownloads(prev => [...prev, ...response.data]);
+      setDownloadsCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error fetching downloads:', error);
+    }
+  };
+
   const handleUpload = async (e) => {
     e.preventDefault();
     if (!uploadForm.file || !uploadForm.title) {
@@ -142,6 +155,11 @@ const Profile = () => {
                 </Button>
               </div>
             ))}
+            {downloadsCursor && (
+              <Button variant="secondary" className="w-full" onClick={fetchMoreDownloads}>
+                Load more
+              </Button>
+            )}
           </div>
         ) : (
           <p className="text-gray-600">No downloads yet.</p>